@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+
+# Runtime settings, overridable through HIKING_* environment variables
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Optional GeoJSON file of extra hiking locations to add to the built-in catalogue
+LOCATIONS_FILE = os.getenv("HIKING_LOCATIONS_FILE", "")
+
+# Optional JSON list of extra regions (home bases), each {"id", "name", "area",
+# "home": [lat, lon], "bbox": [min_lat, min_lon, max_lat, max_lon]}; without a
+# bbox it is computed from the region's locations plus this much padding
+REGIONS_FILE = os.getenv("HIKING_REGIONS_FILE", "")
+REGION_PADDING_DEGREES = float(os.getenv("HIKING_REGION_PADDING_DEGREES", "0.25"))
+
+# Rain grids of every region are snapped to one global lattice: spacings are
+# this many degrees times a power of two, so overlapping regions and different
+# resolutions ask Open-Meteo for the same coordinates. It is also the finest
+# spacing a grid can have.
+GRID_LATTICE_DEGREES = float(os.getenv("HIKING_GRID_LATTICE_DEGREES", "0.0125"))
+
+# Open-Meteo forecast endpoint (point this at a local stand-in for testing)
+OPEN_METEO_URL = os.getenv("HIKING_OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+
+# Shared upstream HTTP client
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("HIKING_UPSTREAM_CONNECT_TIMEOUT", "5"))
+UPSTREAM_READ_TIMEOUT = float(os.getenv("HIKING_UPSTREAM_READ_TIMEOUT", "30"))
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("HIKING_UPSTREAM_MAX_CONNECTIONS", "20"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("HIKING_UPSTREAM_MAX_KEEPALIVE", "10"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("HIKING_UPSTREAM_KEEPALIVE_EXPIRY", "60"))
+UPSTREAM_HTTP2 = _env_bool("HIKING_UPSTREAM_HTTP2", True)  # only used if `h2` is installed
+UPSTREAM_RETRIES = int(os.getenv("HIKING_UPSTREAM_RETRIES", "2"))
+UPSTREAM_BACKOFF_SECONDS = float(os.getenv("HIKING_UPSTREAM_BACKOFF_SECONDS", "0.5"))
+
+# Upstream resilience. Each fetch (with its retries) must finish within the
+# budget; a request waits at most the deadline (per round of concurrent
+# upstream batches its grid needs) before it is served the last known
+# forecast (flagged stale) or a 503.
+UPSTREAM_BUDGET_SECONDS = float(os.getenv("HIKING_UPSTREAM_BUDGET_SECONDS", "20"))
+REQUEST_DEADLINE_SECONDS = float(os.getenv("HIKING_REQUEST_DEADLINE_SECONDS", "8"))
+# Circuit breaker: stop calling Open-Meteo after this many failures in a row,
+# then let one trial request through every reset interval
+UPSTREAM_BREAKER_FAILURES = int(os.getenv("HIKING_UPSTREAM_BREAKER_FAILURES", "5"))
+UPSTREAM_BREAKER_RESET_SECONDS = float(os.getenv("HIKING_UPSTREAM_BREAKER_RESET_SECONDS", "30"))
+# Hedged requests: send a second copy of an upstream request still running
+# after this percentile of recent latencies (off by default; it adds load)
+UPSTREAM_HEDGE = _env_bool("HIKING_UPSTREAM_HEDGE", False)
+UPSTREAM_HEDGE_PERCENTILE = float(os.getenv("HIKING_UPSTREAM_HEDGE_PERCENTILE", "95"))
+
+# Large grids are split into batches of this many points per upstream request
+# (keeps URLs a sensible length), with at most this many requests in flight
+UPSTREAM_BATCH_SIZE = int(os.getenv("HIKING_UPSTREAM_BATCH_SIZE", "200"))
+UPSTREAM_CONCURRENCY = int(os.getenv("HIKING_UPSTREAM_CONCURRENCY", "4"))
+
+# Background forecast pre-warmer (refreshes every mode well inside the cache TTL)
+PREWARM_ENABLED = _env_bool("HIKING_PREWARM_ENABLED", True)
+PREWARM_INTERVAL_SECONDS = float(os.getenv("HIKING_PREWARM_INTERVAL_SECONDS", "1800"))
+PREWARM_JITTER_SECONDS = float(os.getenv("HIKING_PREWARM_JITTER_SECONDS", "60"))
+PREWARM_CONCURRENCY = int(os.getenv("HIKING_PREWARM_CONCURRENCY", "2"))
+PREWARM_RETRY_SECONDS = float(os.getenv("HIKING_PREWARM_RETRY_SECONDS", "30"))
+PREWARM_MAX_BACKOFF_SECONDS = float(os.getenv("HIKING_PREWARM_MAX_BACKOFF_SECONDS", "900"))
+
+# Persistent forecast store shared by all worker processes ("" disables it)
+STORE_PATH = os.getenv("HIKING_STORE_PATH", str(Path(__file__).parent.parent / ".cache" / "forecasts.sqlite3"))
+STORE_MAX_AGE_SECONDS = float(os.getenv("HIKING_STORE_MAX_AGE_SECONDS", str(24 * 60 * 60)))
+
+# Per-stage latency histograms on /metrics, and a Server-Timing header on
+# every response so browser devtools show where the time went
+METRICS_ENABLED = _env_bool("HIKING_METRICS_ENABLED", True)
+SERVER_TIMING_ENABLED = _env_bool("HIKING_SERVER_TIMING_ENABLED", True)
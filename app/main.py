@@ -1,16 +1,75 @@
+import asyncio
+import signal
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 
+from app import config
 from app.routers import api
+from app.services.http_cache import NO_STORE, PAGE_CACHE_CONTROL, cacheable_response, content_etag
+from app.services.events import forecast_events
+from app.services.http_client import create_http_client
+from app.services.metrics import MetricsMiddleware, render_metrics
+from app.services.prewarm import Prewarmer
+from app.services.regions import REGIONS
+from app.services.resilience import UpstreamUnavailable
+from app.services.store import close_store
 
 # Get the app directory
 APP_DIR = Path(__file__).parent
 
+
+def _close_streams_on_exit_signal() -> None:
+    """
+    End open event streams as soon as the server is told to stop. uvicorn
+    waits for open connections to finish before it runs the lifespan
+    shutdown, so closing them there alone would never happen. The server's
+    own handler still runs afterwards.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(forecast_events.close)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the pooled upstream HTTP client and the forecast pre-warmer for the lifetime of the app."""
+    forecast_events.open()
+    _close_streams_on_exit_signal()
+    app.state.http_client = create_http_client()
+    app.state.prewarmer = None
+    if config.PREWARM_ENABLED:
+        app.state.prewarmer = Prewarmer(app.state.http_client)
+        app.state.prewarmer.start()
+    try:
+        yield
+    finally:
+        forecast_events.close()
+        if app.state.prewarmer is not None:
+            await app.state.prewarmer.stop()
+        await app.state.http_client.aclose()
+        close_store()
+
+
 app = FastAPI(
     title="UK Hiking Map",
-    description="Interactive map showing hiking locations with rain forecasts"
+    description="Interactive map showing hiking locations with rain forecasts",
+    lifespan=lifespan
 )
 
 # Mount static files
@@ -19,17 +78,50 @@ app.mount("/static", StaticFiles(directory=APP_DIR / "static"), name="static")
 # Setup templates
 templates = Jinja2Templates(directory=APP_DIR / "templates")
 
+
+def _prerender(name: str) -> tuple[bytes, str]:
+    """Render a page once; the templates only depend on the region registry."""
+    body = templates.get_template(name).render(regions=list(REGIONS.values())).encode()
+    return body, content_etag(body)
+
+
+PAGES = {name: _prerender(name) for name in ("landing.html", "index.html")}
+
+
+def _page(request: Request, name: str):
+    body, etag = PAGES[name]
+    return cacheable_response(request, body, "text/html; charset=utf-8", PAGE_CACHE_CONTROL, etag)
+
 # Include API router
 app.include_router(api.router)
 
 
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable(request: Request, exc: UpstreamUnavailable):
+    """No forecast to serve: a quick 503 instead of a 500 after a long wait."""
+    return JSONResponse(
+        {"detail": str(exc)},
+        status_code=503,
+        headers={"Retry-After": str(max(1, round(exc.retry_after))), "Cache-Control": NO_STORE},
+    )
+
+# Request and per-stage latency metrics (left out entirely when disabled)
+if config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    async def metrics():
+        """Expose latency histograms and cache counters in the Prometheus text format."""
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def landing(request: Request):
     """Serve the landing page with mode selection."""
-    return templates.TemplateResponse("landing.html", {"request": request})
+    return _page(request, "landing.html")
 
 
 @app.get("/map")
 async def map_page(request: Request):
     """Serve the map page."""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return _page(request, "index.html")
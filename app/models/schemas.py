@@ -1,5 +1,10 @@
+import base64
+import numpy as np
 from pydantic import BaseModel
-from typing import Literal
+from typing import TYPE_CHECKING, Literal, Optional
+
+if TYPE_CHECKING:
+    from app.services.weather import WeatherSnapshot
 
 
 class Location(BaseModel):
@@ -11,13 +16,34 @@ class Location(BaseModel):
     description: str
     drive_time: str
     walk_url: str
-    user: Literal["callum", "robert"]
+    user: str  # Region (user mode) id
+
+
+class Region(BaseModel):
+    id: str
+    name: str
+    area: str
+    bbox: list[float]  # [min_lat, min_lon, max_lat, max_lon]
+    home: Optional[list[float]] = None  # [lat, lon]
+    location_count: int
+
+
+class RegionsResponse(BaseModel):
+    regions: list[Region]
 
 
 class LocationsResponse(BaseModel):
     locations: list[Location]
 
 
+class NearbyLocation(Location):
+    distance_km: Optional[float] = None  # From the query point, when one was given
+
+
+class NearbyLocationsResponse(BaseModel):
+    locations: list[NearbyLocation]
+
+
 class HourlyPrecipitation(BaseModel):
     hour: int  # 0-23
     precipitation_mm: float
@@ -39,3 +65,162 @@ class WeatherResponse(BaseModel):
     date: str
     grid: list[GridPoint]
     locations: list[LocationWeather]
+    refreshed_at: Optional[str] = None  # When the forecast was fetched upstream (UTC, ISO 8601)
+    version: Optional[str] = None  # Forecast run id, to pass as `since` to /api/weather/delta
+    stale: bool = False  # True when Open-Meteo is unavailable and this is the last known forecast
+
+
+class WeatherDeltaResponse(BaseModel):
+    date: str
+    version: str
+    since: str
+    full: bool  # True if `since` is no longer known and every point is included
+    grid: list[GridPoint]  # Only the points whose value changed
+    locations: list[LocationWeather]  # Only the locations whose forecast changed
+    refreshed_at: Optional[str] = None
+
+
+class RankedLocation(BaseModel):
+    location_id: int
+    name: str
+    score: float  # Higher is drier
+    total_mm: float  # Total precipitation during walking hours over the range
+    dry_hours: int  # Walking hours with no rain over the range
+    longest_dry_hours: int  # Longest run of dry walking hours on any one day
+    best_date: str  # Driest day in the range
+
+
+class RankingResponse(BaseModel):
+    mode: str
+    from_date: str
+    to_date: str
+    locations: list[RankedLocation]  # Best first
+    refreshed_at: Optional[str] = None
+
+
+# Compact weather encoding: the grid is described by its origin, step and
+# dimensions, and precipitation values travel as one packed little-endian
+# array (base64) instead of an object per point.
+CompactEncoding = Literal["f32", "u8"]
+
+COMPACT_MEDIA_TYPE = "application/vnd.hiking.compact+json"
+
+# Quantized (u8) values are mm / scale; 0.1mm matches Open-Meteo's precision
+U8_SCALE_MM = 0.1
+
+
+class PackedValues(BaseModel):
+    encoding: CompactEncoding
+    scale: float  # Multiply decoded values by this to get mm (1.0 for f32)
+    shape: list[int]  # Row-major
+    data: str  # base64 little-endian float32 or uint8
+
+
+class CompactGrid(BaseModel):
+    origin: list[float]  # [min_lat, min_lon] (south-west corner)
+    step: list[float]  # [lat_step, lon_step]
+    dims: list[int]  # [rows, cols]
+    precipitation_mm: PackedValues  # Totals for 9am-5pm, rows x cols
+
+
+class CompactLocations(BaseModel):
+    location_ids: list[int]
+    hours: list[int]  # Column labels for hourly (9-17)
+    hourly: PackedValues  # locations x hours
+    total_mm: list[float]
+
+
+class CompactWeatherResponse(BaseModel):
+    date: str
+    grid: CompactGrid
+    locations: CompactLocations
+    refreshed_at: Optional[str] = None
+    version: Optional[str] = None
+    stale: bool = False
+
+
+def pack_values(values: np.ndarray, encoding: CompactEncoding = "f32") -> PackedValues:
+    """Pack an array of mm values as float32, or quantized to uint8 steps of at least 0.1mm."""
+    if encoding == "u8":
+        peak = float(values.max()) if values.size else 0.0
+        scale = max(U8_SCALE_MM, peak / 255)
+        packed = np.clip(np.rint(values / scale), 0, 255).astype(np.uint8)
+    else:
+        scale = 1.0
+        packed = values.astype("<f4")
+    return PackedValues(
+        encoding=encoding,
+        scale=scale,
+        shape=list(values.shape),
+        data=base64.b64encode(packed.tobytes()).decode("ascii")
+    )
+
+
+def unpack_values(packed: PackedValues) -> np.ndarray:
+    """Decode PackedValues back into a float array of mm."""
+    dtype = np.uint8 if packed.encoding == "u8" else np.dtype("<f4")
+    values = np.frombuffer(base64.b64decode(packed.data), dtype=dtype).reshape(packed.shape)
+    return values * packed.scale if packed.encoding == "u8" else values
+
+
+def encode_compact_weather(
+    snapshot: "WeatherSnapshot",
+    encoding: CompactEncoding = "f32",
+    refreshed_at: Optional[str] = None,
+    version: Optional[str] = None
+) -> CompactWeatherResponse:
+    """Encode a weather snapshot in the compact columnar format."""
+    grid = snapshot.grid
+    return CompactWeatherResponse(
+        date=snapshot.date.isoformat(),
+        grid=CompactGrid(
+            origin=[grid.min_lat, grid.min_lon],
+            step=[grid.lat_step, grid.lon_step],
+            dims=[grid.rows, grid.cols],
+            precipitation_mm=pack_values(snapshot.grid_totals.reshape(grid.rows, grid.cols), encoding)
+        ),
+        locations=CompactLocations(
+            location_ids=snapshot.location_ids,
+            hours=snapshot.hours,
+            hourly=pack_values(snapshot.location_hours, encoding),
+            total_mm=snapshot.location_totals.tolist()
+        ),
+        refreshed_at=refreshed_at,
+        version=version,
+        stale=snapshot.stale
+    )
+
+
+class CacheStats(BaseModel):
+    hits: int
+    stale_hits: int
+    misses: int
+    coalesced: int
+    refreshes: int
+    errors: int
+    evictions: int
+    entries: int
+    inflight: int
+    hit_ratio: float
+    fetches: int
+    fetch_ms_avg: float
+    fetch_ms_max: float
+
+
+class ModeHealth(BaseModel):
+    mode: str
+    refreshed_at: Optional[str]  # When today's forecast was last fetched (UTC, ISO 8601)
+    age_seconds: Optional[float]
+    fresh: bool
+    consecutive_failures: int
+    last_error: Optional[str]
+
+
+class HealthResponse(BaseModel):
+    status: Literal["ok", "stale", "empty"]
+    prewarm_enabled: bool
+    # With several workers sharing a store only the leader pre-warms; the
+    # others report the forecast it keeps in the store
+    prewarm_role: Optional[Literal["leader", "standby"]] = None
+    upstream_circuit: Literal["closed", "open", "half-open"] = "closed"  # Open-Meteo circuit breaker
+    modes: list[ModeHealth]
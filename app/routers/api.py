@@ -1,41 +1,394 @@
-from fastapi import APIRouter, Query
+import asyncio
+import time
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from datetime import date
-from typing import Literal
+from pydantic import BaseModel
+from typing import Literal, Optional
 
-from app.models.schemas import LocationsResponse, WeatherResponse
-from app.services.locations import get_all_locations
-from app.services.weather import get_weather_data
+from app.models.schemas import (
+    COMPACT_MEDIA_TYPE,
+    CacheStats,
+    CompactEncoding,
+    CompactWeatherResponse,
+    HealthResponse,
+    LocationsResponse,
+    NearbyLocation,
+    NearbyLocationsResponse,
+    RankingResponse,
+    Region,
+    RegionsResponse,
+    WeatherDeltaResponse,
+    WeatherResponse,
+    encode_compact_weather,
+)
+from app.services.compression import compress, negotiate_encoding
+from app.services.frames import (
+    FRAMES_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    FrameFormat,
+    FrameStep,
+    binary_frames,
+    ndjson_frames,
+    prepare_frames,
+)
+from app.services.http_cache import (
+    NO_CACHE,
+    NO_STORE,
+    STATIC_CACHE_CONTROL,
+    cacheable_response,
+    etag_matches,
+    forecast_cache_control,
+    not_modified,
+    version_etag,
+)
+from app.services.http_client import get_http_client
+from app.services.locations import get_all_locations, get_location_index
+from app.services.metrics import timed
+from app.services.prewarm import forecast_health
+from app.services.ranking import rank_locations
+from app.services.regions import DEFAULT_REGION, REGIONS
+from app.services.tiles import MAX_ZOOM, get_rain_tile
+from app.services.updates import build_weather_delta, forecast_stream, snapshot_history
+from app.services.weather import (
+    FORECAST_STALE_SECONDS,
+    FORECAST_TTL_SECONDS,
+    GRID_SIZE,
+    MAX_GRID_SIZE,
+    build_weather_response,
+    forecast_cache,
+    get_weather_snapshot,
+    isoformat_timestamp,
+)
 
 router = APIRouter(prefix="/api", tags=["api"])
 
-Mode = Literal["callum", "robert"]
+def region_mode(
+    mode: str = Query(default=DEFAULT_REGION, description="Region (user mode) id, e.g. callum (London) or robert (Newton-le-Willows); see /api/regions")
+) -> str:
+    if mode not in REGIONS:
+        raise HTTPException(status_code=422, detail=f"Unknown mode {mode!r}; see /api/regions")
+    return mode
+
+
+def optional_region_mode(
+    mode: Optional[str] = Query(default=None, description="Only return hikes for this region (user mode)")
+) -> Optional[str]:
+    return None if mode is None else region_mode(mode)
+
+
+def _static_json(request: Request, payload: BaseModel) -> Response:
+    """A JSON response derived only from the location catalogue, with a content-hash ETag."""
+    return cacheable_response(request, payload.model_dump_json().encode(), "application/json", STATIC_CACHE_CONTROL)
+
+
+def _forecast_cache_control(refreshed_at: float) -> str:
+    return forecast_cache_control(time.time() - refreshed_at, FORECAST_TTL_SECONDS, FORECAST_STALE_SECONDS)
+
+
+@router.get("/regions", response_model=RegionsResponse)
+async def get_regions(request: Request):
+    """Return every region (user mode) with its bounding box and number of hikes."""
+    return _static_json(request, RegionsResponse(regions=[
+        Region(
+            id=region.id,
+            name=region.name,
+            area=region.area,
+            bbox=[region.min_lat, region.min_lon, region.max_lat, region.max_lon],
+            home=list(region.home) if region.home else None,
+            location_count=len(get_all_locations(region.id))
+        )
+        for region in REGIONS.values()
+    ]))
 
 
 @router.get("/locations", response_model=LocationsResponse)
 async def get_locations(
-    mode: Mode = Query(default="callum", description="User mode: callum (London) or robert (Newton-le-Willows)")
+    request: Request,
+    mode: str = Depends(region_mode)
 ):
-    """Return all 20 hiking locations with coordinates and details for the selected mode."""
-    locations = get_all_locations(mode)
-    return LocationsResponse(locations=locations)
+    """Return the hiking locations, with coordinates and details for the selected mode."""
+    body, etag = get_location_index().locations_json(mode)
+    return cacheable_response(request, body, "application/json", STATIC_CACHE_CONTROL, etag)
 
 
-@router.get("/weather", response_model=WeatherResponse)
+@router.get("/locations/nearest", response_model=NearbyLocationsResponse)
+async def get_nearest_locations(
+    request: Request,
+    lat: float = Query(ge=-90, le=90, description="Latitude of the search point"),
+    lon: float = Query(ge=-180, le=180, description="Longitude of the search point"),
+    n: int = Query(default=5, ge=1, le=100, description="Number of hikes to return"),
+    mode: Optional[str] = Depends(optional_region_mode)
+):
+    """Return the n hiking locations closest to a point, nearest first."""
+    return _static_json(request, NearbyLocationsResponse(locations=[
+        NearbyLocation.model_construct(**loc._asdict(), distance_km=round(distance, 2))
+        for loc, distance in get_location_index().nearest(lat, lon, n, mode)
+    ]))
+
+
+@router.get("/locations/within", response_model=NearbyLocationsResponse)
+async def get_locations_within(
+    request: Request,
+    lat: Optional[float] = Query(default=None, ge=-90, le=90, description="Latitude of the circle centre"),
+    lon: Optional[float] = Query(default=None, ge=-180, le=180, description="Longitude of the circle centre"),
+    radius_km: Optional[float] = Query(default=None, gt=0, le=1000, description="Circle radius in km"),
+    bbox: Optional[str] = Query(default=None, description="Bounding box as min_lat,min_lon,max_lat,max_lon"),
+    mode: Optional[str] = Depends(optional_region_mode)
+):
+    """Return hiking locations within a radius of a point (nearest first) or inside a bounding box."""
+    if bbox is not None:
+        try:
+            min_lat, min_lon, max_lat, max_lon = (float(v) for v in bbox.split(","))
+            # Comparisons are False for NaN, so this also rejects non-numbers
+            if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lon <= max_lon <= 180):
+                raise ValueError(bbox)
+        except ValueError:
+            raise HTTPException(
+                status_code=422,
+                detail="bbox must be min_lat,min_lon,max_lat,max_lon with min <= max, latitudes in -90..90 and longitudes in -180..180",
+            )
+        return _static_json(request, NearbyLocationsResponse(locations=[
+            NearbyLocation.model_construct(**loc._asdict())
+            for loc in get_location_index().within_bbox(min_lat, min_lon, max_lat, max_lon, mode)
+        ]))
+
+    if lat is None or lon is None or radius_km is None:
+        raise HTTPException(status_code=422, detail="Give either bbox or lat, lon and radius_km")
+    return _static_json(request, NearbyLocationsResponse(locations=[
+        NearbyLocation.model_construct(**loc._asdict(), distance_km=round(distance, 2))
+        for loc, distance in get_location_index().within_radius(lat, lon, radius_km, mode)
+    ]))
+
+
+@router.get(
+    "/weather",
+    response_model=WeatherResponse,
+    responses={200: {"content": {COMPACT_MEDIA_TYPE: {"schema": CompactWeatherResponse.model_json_schema()}}}}
+)
 async def get_weather(
+    request: Request,
     date_param: date = Query(default=None, alias="date", description="Date for weather forecast (YYYY-MM-DD)"),
-    mode: Mode = Query(default="callum", description="User mode: callum (London) or robert (Newton-le-Willows)")
+    mode: str = Depends(region_mode),
+    resolution: int = Query(default=GRID_SIZE, ge=3, le=MAX_GRID_SIZE, description="Rain grid points per side (the nearest the region's lattice allows)"),
+    format_param: Optional[Literal["json", "compact"]] = Query(default=None, alias="format", description="Response format (or send Accept: " + COMPACT_MEDIA_TYPE + ")"),
+    encoding: CompactEncoding = Query(default="f32", description="Compact value encoding: f32 or quantized u8"),
+    client: httpx.AsyncClient = Depends(get_http_client)
 ):
     """
     Return precipitation data for the specified date and mode.
-    Includes an 8x8 grid for the rain overlay and each location's forecast.
+    Includes a grid of about resolution x resolution points (8x8 by default)
+    snapped to the global lattice for the rain overlay, each location's forecast and when the forecast was last
+    refreshed from Open-Meteo.
+
+    The compact format sends the grid as origin/step/dims plus one packed
+    precipitation array and location hours as one matrix, compressed with
+    brotli or gzip when the client accepts it.
+
+    Responses carry an ETag for the forecast run they came from and are
+    cacheable until that run is due a refresh. While Open-Meteo is down the
+    last known forecast is served with stale=true.
+    """
+    if date_param is None:
+        date_param = date.today()
+
+    snapshot = await get_weather_snapshot(client, date_param, mode, resolution)
+    # Kept so a later /api/weather/delta can send just what changed since this run
+    version = snapshot_history.record(mode, snapshot)
+
+    if format_param is None:
+        format_param = "compact" if COMPACT_MEDIA_TYPE in request.headers.get("accept", "") else "json"
+    accept_encoding = request.headers.get("accept-encoding", "")
+    compact = format_param == "compact"
+
+    # The forecast run identifies the body, so a revalidation is answered before anything is built
+    etag = version_etag(
+        "weather", mode, snapshot.date, resolution, format_param,
+        encoding if compact else "", negotiate_encoding(accept_encoding) if compact else "",
+        snapshot.refreshed_at, snapshot.stale,
+    )
+    cache_control = _forecast_cache_control(snapshot.refreshed_at)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control, headers)
+
+    if not compact:
+        response = build_weather_response(snapshot)
+        # Serialize here rather than in FastAPI so the time shows up as its own stage
+        with timed("serialize"):
+            body = response.model_dump_json().encode()
+        return cacheable_response(request, body, "application/json", cache_control, etag, headers)
+
+    with timed("serialize"):
+        compact_response = encode_compact_weather(snapshot, encoding, isoformat_timestamp(snapshot.refreshed_at), version)
+        payload = compact_response.model_dump_json().encode()
+    with timed("compress"):
+        body, content_encoding = compress(payload, accept_encoding)
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return cacheable_response(request, body, COMPACT_MEDIA_TYPE, cache_control, etag, headers)
+
+
+@router.get("/weather/delta", response_model=WeatherDeltaResponse)
+async def get_weather_delta(
+    request: Request,
+    since: str = Query(description="Forecast version the client already has (from /api/weather)"),
+    date_param: date = Query(default=None, alias="date", description="Date for weather forecast (YYYY-MM-DD)"),
+    mode: str = Depends(region_mode),
+    resolution: int = Query(default=GRID_SIZE, ge=3, le=MAX_GRID_SIZE, description="Rain grid points per side (the nearest the region's lattice allows)"),
+    client: httpx.AsyncClient = Depends(get_http_client)
+):
+    """
+    Return only the grid points and locations whose forecast changed since
+    the client's version. An unchanged forecast gives empty lists; a version
+    the server no longer remembers gives everything, with full=true.
     """
     if date_param is None:
         date_param = date.today()
 
-    grid_points, location_weather = await get_weather_data(date_param, mode)
+    snapshot = await get_weather_snapshot(client, date_param, mode, resolution)
+    # Whether `since` is still remembered varies by worker, so the ETag is a hash of the body
+    body = build_weather_delta(mode, snapshot, since).model_dump_json().encode()
+    # A browser reusing this for the same `since` would miss the next run
+    return cacheable_response(request, body, "application/json", NO_CACHE)
+
 
-    return WeatherResponse(
-        date=date_param.isoformat(),
-        grid=grid_points,
-        locations=location_weather
+@router.get("/weather/stream", response_class=StreamingResponse, responses={200: {"content": {"text/event-stream": {}}}})
+async def stream_weather_updates(
+    mode: str = Depends(region_mode),
+    client: httpx.AsyncClient = Depends(get_http_client)
+):
+    """
+    Server-Sent Events stream of new forecast runs for a mode. Each `forecast`
+    event carries the new version; clients then ask /api/weather/delta for
+    what changed.
+    """
+    return StreamingResponse(
+        forecast_stream(client, mode),
+        media_type="text/event-stream",
+        headers={"Cache-Control": NO_STORE, "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/weather/frames",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, FRAMES_MEDIA_TYPE: {}}}}
+)
+async def stream_weather_frames(
+    request: Request,
+    mode: str = Depends(region_mode),
+    from_date: date = Query(default=None, alias="from", description="First date (YYYY-MM-DD, default today)"),
+    to_date: date = Query(default=None, alias="to", description="Last date (YYYY-MM-DD, default the end of the forecast)"),
+    step: FrameStep = Query(default="day", description="One frame per day (walking-hour totals) or per hour"),
+    resolution: int = Query(default=GRID_SIZE, ge=3, le=MAX_GRID_SIZE, description="Rain grid points per side (the nearest the region's lattice allows)"),
+    format_param: Optional[FrameFormat] = Query(default=None, alias="format", description="ndjson or length-prefixed binary (or send Accept: " + FRAMES_MEDIA_TYPE + ")"),
+    client: httpx.AsyncClient = Depends(get_http_client)
+):
+    """
+    Stream the rain grid as a sequence of frames for animating the forecast:
+    a header with the grid layout, then one frame per day or per hour.
+
+    Every frame comes from the one cached multi-day forecast and is encoded
+    as it is sent, so the first frame arrives straight away and memory use
+    does not grow with the number of frames.
+    """
+    if from_date is None:
+        from_date = date.today()
+
+    try:
+        source = await prepare_frames(client, mode, from_date, to_date, step, resolution)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    if format_param is None:
+        format_param = "binary" if FRAMES_MEDIA_TYPE in request.headers.get("accept", "") else "ndjson"
+    etag = version_etag(
+        "frames", mode, source.first_day, source.last_day, source.start_date, step, resolution, format_param,
+        source.refreshed_at,
     )
+    cache_control = _forecast_cache_control(source.refreshed_at)
+    headers = {"Vary": "Accept"}
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control, headers)
+
+    if format_param == "binary":
+        frames, media_type = binary_frames(source), FRAMES_MEDIA_TYPE
+    else:
+        frames, media_type = ndjson_frames(source), NDJSON_MEDIA_TYPE
+    return StreamingResponse(
+        frames,
+        media_type=media_type,
+        headers={**headers, "ETag": etag, "Cache-Control": cache_control, "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/rain/{z}/{x}/{y}.png", response_class=Response, responses={200: {"content": {"image/png": {}}}})
+async def get_rain_tile_png(
+    request: Request,
+    z: int = Path(ge=0, le=MAX_ZOOM),
+    x: int = Path(ge=0),
+    y: int = Path(ge=0),
+    date_param: date = Query(default=None, alias="date", description="Date for weather forecast (YYYY-MM-DD)"),
+    mode: str = Depends(region_mode),
+    resolution: int = Query(default=GRID_SIZE, ge=3, le=MAX_GRID_SIZE, description="Rain grid points per side (the nearest the region's lattice allows)"),
+    client: httpx.AsyncClient = Depends(get_http_client)
+):
+    """Return a 256x256 XYZ PNG tile of the interpolated rain overlay."""
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    if date_param is None:
+        date_param = date.today()
+
+    snapshot = await get_weather_snapshot(client, date_param, mode, resolution)
+    body, etag = get_rain_tile(snapshot, mode, z, x, y)
+    return cacheable_response(request, body, "image/png", _forecast_cache_control(snapshot.refreshed_at), etag)
+
+
+@router.get("/ranking", response_model=RankingResponse)
+async def get_ranking(
+    request: Request,
+    mode: str = Depends(region_mode),
+    from_date: date = Query(default=None, alias="from", description="First date of the range (YYYY-MM-DD, default today)"),
+    to_date: date = Query(default=None, alias="to", description="Last date of the range (YYYY-MM-DD, default from)"),
+    k: int = Query(default=5, ge=1, le=100, description="Number of hikes to return"),
+    client: httpx.AsyncClient = Depends(get_http_client)
+):
+    """
+    Rank the mode's hikes by how dry their walking hours are over a date range,
+    scoring total rain, dry hours and the longest dry window, best first.
+    """
+    if from_date is None:
+        from_date = date.today()
+    if to_date is None:
+        to_date = from_date
+
+    try:
+        ranked, refreshed_at = await rank_locations(client, mode, from_date, to_date, k)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    body = RankingResponse(
+        mode=mode,
+        from_date=from_date.isoformat(),
+        to_date=to_date.isoformat(),
+        locations=ranked,
+        refreshed_at=isoformat_timestamp(refreshed_at)
+    ).model_dump_json().encode()
+    return cacheable_response(request, body, "application/json", _forecast_cache_control(refreshed_at))
+
+
+@router.get("/cache/stats", response_model=CacheStats)
+async def get_cache_stats(response: Response):
+    """Return hit/miss counters and upstream latency for the forecast cache."""
+    response.headers["Cache-Control"] = NO_STORE
+    return CacheStats(**forecast_cache.stats())
+
+
+@router.get("/health", response_model=HealthResponse)
+async def get_health(request: Request, response: Response):
+    """Report how fresh today's cached forecast is for each mode."""
+    response.headers["Cache-Control"] = NO_STORE
+    # Reads the shared store, so off the event loop
+    return await asyncio.to_thread(forecast_health, request.app.state.prewarmer)
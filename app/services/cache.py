@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from app.services.metrics import record_cache_lookup
+
+
+class CacheEntry:
+    """
+    A cached value and the wall-clock time it was fetched. `stale` marks an
+    entry served past its lifetime because a fresh one could not be fetched.
+    """
+
+    __slots__ = ("value", "fetched_at", "stale")
+
+    def __init__(self, value: Any, fetched_at: float, stale: bool = False):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.stale = stale
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class ForecastCache:
+    """
+    In-process LRU cache for upstream forecasts.
+
+    Entries younger than `ttl` are served as-is. Entries older than that but
+    within `stale_ttl` more are served immediately while a single background
+    refresh runs. Concurrent misses for the same key share one in-flight fetch.
+    A fetch may return a CacheEntry to say how old its data already is.
+    Lookups are reported to the metrics under `name`.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, max_entries: int = 128, name: str = "cache"):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "errors": 0,
+            "evictions": 0,
+        }
+        self._fetch_count = 0
+        self._fetch_seconds = 0.0
+        self._fetch_seconds_max = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> CacheEntry:
+        """Return the entry for `key`, calling `fetch` only when nothing usable is cached."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = entry.age
+            if age < self.ttl:
+                self._counters["hits"] += 1
+                record_cache_lookup(self.name, "hit")
+                self._entries.move_to_end(key)
+                return entry
+            if age < self.ttl + self.stale_ttl:
+                self._counters["stale_hits"] += 1
+                record_cache_lookup(self.name, "stale")
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self._counters["refreshes"] += 1
+                    self._start_fetch(key, fetch)
+                return entry
+
+        if key in self._inflight:
+            self._counters["coalesced"] += 1
+            record_cache_lookup(self.name, "coalesced")
+        else:
+            self._counters["misses"] += 1
+            record_cache_lookup(self.name, "miss")
+            self._start_fetch(key, fetch)
+        return await asyncio.shield(self._inflight[key])
+
+    async def refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> CacheEntry:
+        """Fetch `key` now regardless of age, joining any fetch already in flight."""
+        if key not in self._inflight:
+            self._counters["refreshes"] += 1
+            self._start_fetch(key, fetch)
+        return await asyncio.shield(self._inflight[key])
+
+    def _start_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._run_fetch(key, fetch))
+        self._inflight[key] = task
+        # Background refreshes may have no waiter; mark their errors as seen
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _run_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> CacheEntry:
+        started = time.perf_counter()
+        try:
+            value = await fetch()
+        except Exception:
+            self._counters["errors"] += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            elapsed = time.perf_counter() - started
+            self._fetch_count += 1
+            self._fetch_seconds += elapsed
+            self._fetch_seconds_max = max(self._fetch_seconds_max, elapsed)
+
+        entry = value if isinstance(value, CacheEntry) else CacheEntry(value, time.time())
+        self._store(key, entry)
+        return entry
+
+    def _store(self, key: Hashable, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def put(self, key: Hashable, value: Any, fetched_at: Optional[float] = None) -> CacheEntry:
+        """Store `value` under `key`, fetched now unless `fetched_at` says otherwise."""
+        entry = CacheEntry(value, time.time() if fetched_at is None else fetched_at)
+        self._store(key, entry)
+        return entry
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the cached entry for `key` regardless of age, without touching stats."""
+        return self._entries.get(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and upstream fetch latency for this cache."""
+        lookups = self._counters["hits"] + self._counters["stale_hits"] + self._counters["misses"] + self._counters["coalesced"]
+        served_from_cache = lookups - self._counters["misses"]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hit_ratio": round(served_from_cache / lookups, 4) if lookups else 0.0,
+            "fetches": self._fetch_count,
+            "fetch_ms_avg": round(self._fetch_seconds / self._fetch_count * 1000, 2) if self._fetch_count else 0.0,
+            "fetch_ms_max": round(self._fetch_seconds_max * 1000, 2),
+        }
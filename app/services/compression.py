@@ -0,0 +1,42 @@
+import gzip
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 512
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The best coding the client accepts (brotli, then gzip), if any."""
+    if not accept_encoding:
+        return None
+    if brotli is not None and _accepts(accept_encoding, "br"):
+        return "br"
+    if _accepts(accept_encoding, "gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, accept_encoding: str) -> tuple[bytes, Optional[str]]:
+    """
+    Compress `body` with the best coding the client accepts (brotli, then gzip).
+    Returns the (possibly unchanged) body and its Content-Encoding, if any.
+    """
+    coding = negotiate_encoding(accept_encoding)
+    if coding is None or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if coding == "br":
+        return brotli.compress(body, quality=5), "br"
+    return gzip.compress(body, compresslevel=6), "gzip"
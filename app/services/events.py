@@ -0,0 +1,56 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Iterator
+
+# Events a slow subscriber may fall behind by before newer ones are dropped for it
+SUBSCRIBER_BUFFER = 16
+
+
+class ForecastEvents:
+    """
+    In-process broadcast of new forecast runs to streaming clients.
+
+    Each subscriber gets its own bounded queue; publishing never blocks, and
+    a subscriber that is not keeping up simply misses events (the next one
+    tells it the latest version anyway). When the app shuts down, close()
+    sends every subscriber None so streams end instead of holding the
+    server open.
+    """
+
+    def __init__(self):
+        self._subscribers: set[asyncio.Queue] = set()
+        self.closed = False
+
+    def publish(self, event: dict) -> None:
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass
+
+    def open(self) -> None:
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+        if self.closed:
+            queue.put_nowait(None)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+forecast_events = ForecastEvents()
@@ -0,0 +1,144 @@
+import json
+import struct
+from datetime import date, timedelta
+from typing import Iterator, Literal, NamedTuple, Optional
+
+import httpx
+import numpy as np
+
+from app.services.weather import (
+    GRID_SIZE,
+    HOURS_PER_DAY,
+    GridSpec,
+    Mode,
+    _forecast_points,
+    forecast_version,
+    get_forecast,
+    grid_spec,
+    isoformat_timestamp,
+    sum_walking_hours,
+)
+
+FrameStep = Literal["day", "hour"]
+FrameFormat = Literal["ndjson", "binary"]
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+FRAMES_MEDIA_TYPE = "application/vnd.hiking.frames"
+
+# Binary frame header after the length prefix: day index from `from`, hour (NO_HOUR for day totals)
+_FRAME_HEADER = struct.Struct("<HB")
+_LENGTH = struct.Struct("<I")
+NO_HOUR = 255
+
+
+class FrameSource(NamedTuple):
+    """The slice of a cached forecast horizon a frame stream is generated from."""
+    mode: Mode
+    grid: GridSpec
+    grid_hourly: np.ndarray  # grid points x horizon hours, a view of the cached forecast
+    start_date: date  # First day of grid_hourly
+    first_day: int
+    last_day: int
+    step: FrameStep
+    refreshed_at: float
+
+    @property
+    def frame_count(self) -> int:
+        days = self.last_day - self.first_day + 1
+        return days if self.step == "day" else days * HOURS_PER_DAY
+
+
+async def prepare_frames(
+    client: httpx.AsyncClient,
+    mode: Mode,
+    from_date: date,
+    to_date: Optional[date],
+    step: FrameStep = "day",
+    size: int = GRID_SIZE
+) -> FrameSource:
+    """
+    Fetch (or reuse) the mode's forecast horizon and check the date range
+    against it; to_date defaults to the end of the horizon. Raises ValueError
+    if the dates fall outside the forecast horizon.
+    """
+    grid_coords, _ = _forecast_points(mode, size)
+    entry = await get_forecast(client, mode, size=size)
+    horizon = entry.value
+    end = horizon.start_date + timedelta(days=horizon.days - 1)
+    first_day = (from_date - horizon.start_date).days
+    last_day = ((to_date or end) - horizon.start_date).days
+    if first_day < 0 or last_day >= horizon.days or first_day > last_day:
+        raise ValueError(f"Dates must be within {horizon.start_date.isoformat()} to {end.isoformat()}, from <= to")
+    return FrameSource(
+        mode=mode,
+        grid=grid_spec(mode, size),
+        grid_hourly=horizon.hourly[:len(grid_coords)],
+        start_date=horizon.start_date,
+        first_day=first_day,
+        last_day=last_day,
+        step=step,
+        refreshed_at=entry.fetched_at,
+    )
+
+
+def iter_frames(source: FrameSource) -> Iterator[tuple[int, Optional[int], np.ndarray]]:
+    """
+    Yield (day index from the first day, hour or None, grid values) one frame
+    at a time: walking-hour totals per day, or each hour's precipitation.
+    """
+    for day in range(source.first_day, source.last_day + 1):
+        day_hourly = source.grid_hourly[:, day * HOURS_PER_DAY:(day + 1) * HOURS_PER_DAY]
+        if source.step == "day":
+            yield day - source.first_day, None, sum_walking_hours(day_hourly)
+        else:
+            for hour in range(HOURS_PER_DAY):
+                yield day - source.first_day, hour, day_hourly[:, hour]
+
+
+def frame_header(source: FrameSource) -> dict:
+    grid = source.grid
+    return {
+        "type": "header",
+        "mode": source.mode,
+        "step": source.step,
+        "from": (source.start_date + timedelta(days=source.first_day)).isoformat(),
+        "to": (source.start_date + timedelta(days=source.last_day)).isoformat(),
+        "frames": source.frame_count,
+        "grid": {
+            "origin": [grid.min_lat, grid.min_lon],
+            "step": [grid.lat_step, grid.lon_step],
+            "dims": [grid.rows, grid.cols],
+        },
+        "refreshed_at": isoformat_timestamp(source.refreshed_at),
+        "version": forecast_version(source.refreshed_at),
+    }
+
+
+def ndjson_frames(source: FrameSource) -> Iterator[bytes]:
+    """
+    One JSON object per line: the header, then a frame per day or hour with
+    the grid's precipitation in mm (row-major from the south-west corner).
+    """
+    yield json.dumps(frame_header(source)).encode() + b"\n"
+    first = source.start_date + timedelta(days=source.first_day)
+    for day, hour, values in iter_frames(source):
+        yield json.dumps({
+            "type": "frame",
+            "date": (first + timedelta(days=day)).isoformat(),
+            "hour": hour,
+            "precipitation_mm": values.astype(np.float64).round(2).tolist(),
+        }).encode() + b"\n"
+
+
+def binary_frames(source: FrameSource) -> Iterator[bytes]:
+    """
+    Length-prefixed frames: each is a little-endian u32 byte length followed
+    by that many bytes. The first frame is the JSON header; each later one is
+    a u16 day index (from `from`), a u8 hour (255 for day totals) and the
+    grid's values as little-endian float32, row-major from the south-west corner.
+    """
+    header = json.dumps(frame_header(source)).encode()
+    yield _LENGTH.pack(len(header)) + header
+    for day, hour, values in iter_frames(source):
+        payload = _FRAME_HEADER.pack(day, NO_HOUR if hour is None else hour) + values.astype("<f4").tobytes()
+        yield _LENGTH.pack(len(payload)) + payload
@@ -0,0 +1,70 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Static data: browsers may reuse it for an hour and CDNs serve it stale for a day while revalidating
+STATIC_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+# Pages link their scripts with ?v= cache-busting, so the HTML itself is kept short
+PAGE_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=86400"
+# Live status endpoints
+NO_STORE = "no-store"
+# Answers that depend on what the client already has: always revalidated
+# (a 304 when unchanged), never reused from a cache without asking
+NO_CACHE = "no-cache"
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag from a hash of the response body."""
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def version_etag(*parts) -> str:
+    """
+    Strong ETag from whatever identifies a representation (e.g. the forecast
+    run, query parameters and encoding), so it can be checked before the
+    body is built.
+    """
+    return content_etag("\x1f".join(str(part) for part in parts).encode())
+
+
+def forecast_cache_control(age: float, ttl: float, stale_ttl: float) -> str:
+    """Cache-Control for data from a forecast `age` seconds old: fresh until the cache TTL runs out."""
+    max_age = max(0, int(ttl - age))
+    return f"public, max-age={max_age}, stale-while-revalidate={int(stale_ttl)}"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match covers `etag` (weak comparison, as RFC 9110 requires)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str, headers: Optional[dict[str, str]] = None) -> Response:
+    return Response(status_code=304, headers={**(headers or {}), "ETag": etag, "Cache-Control": cache_control})
+
+
+def cacheable_response(
+    request: Request,
+    body: bytes,
+    media_type: str,
+    cache_control: str,
+    etag: Optional[str] = None,
+    headers: Optional[dict[str, str]] = None
+) -> Response:
+    """
+    Send `body` with an ETag (its content hash unless given) and
+    Cache-Control, or an empty 304 if the client already has it.
+    """
+    etag = etag or content_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control, headers)
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={**(headers or {}), "ETag": etag, "Cache-Control": cache_control},
+    )
@@ -0,0 +1,130 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+import httpx
+from fastapi import Request
+
+from app import config
+from app.services.metrics import record_upstream_event
+from app.services.resilience import upstream_breaker, upstream_latency
+
+# Upstream statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Build the pooled client shared by all upstream calls.
+    Pass `transport` (e.g. httpx.MockTransport) to replace the network in tests.
+    """
+    limits = httpx.Limits(
+        max_connections=config.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=config.UPSTREAM_MAX_KEEPALIVE,
+        keepalive_expiry=config.UPSTREAM_KEEPALIVE_EXPIRY,
+    )
+    http2 = config.UPSTREAM_HTTP2 and _http2_available()
+    if transport is None:
+        # No retries here: get_with_retries retries connection errors too, within its budget
+        transport = httpx.AsyncHTTPTransport(http2=http2, limits=limits, retries=0)
+
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(config.UPSTREAM_READ_TIMEOUT, connect=config.UPSTREAM_CONNECT_TIMEOUT),
+    )
+
+
+async def _first_response(client: httpx.AsyncClient, url: str, params: dict, timeout: httpx.Timeout) -> httpx.Response:
+    """
+    One upstream attempt. With hedging on, a second identical request is sent
+    if the first is still running after the UPSTREAM_HEDGE_PERCENTILE of recent
+    latencies; the first response wins and the other request is cancelled.
+    """
+    started = time.monotonic()
+    hedge_after = upstream_latency.percentile(config.UPSTREAM_HEDGE_PERCENTILE) if config.UPSTREAM_HEDGE else None
+    if hedge_after is None:
+        response = await client.get(url, params=params, timeout=timeout)
+    else:
+        first = asyncio.ensure_future(client.get(url, params=params, timeout=timeout))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if not done:
+                record_upstream_event("hedged")
+                pending.add(asyncio.ensure_future(client.get(url, params=params, timeout=timeout)))
+            while True:
+                if not done:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = done.pop()
+                if winner.exception() is None or not pending:
+                    response = winner.result()
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+        if winner is not first:
+            record_upstream_event("hedge-won")
+    upstream_latency.record(time.monotonic() - started)
+    return response
+
+
+async def get_with_retries(
+    client: httpx.AsyncClient,
+    url: str,
+    params: dict,
+    budget: Optional[float] = None
+) -> httpx.Response:
+    """
+    GET `url`, retrying connection errors, timeouts, 429s and 5xx responses
+    with jittered exponential backoff, all within `budget` seconds
+    (UPSTREAM_BUDGET_SECONDS by default); an attempt still running when the
+    budget runs out is cut off. Every attempt goes through the circuit
+    breaker, which raises UpstreamUnavailable straight away while Open-Meteo
+    is down.
+    """
+    deadline = time.monotonic() + (config.UPSTREAM_BUDGET_SECONDS if budget is None else budget)
+    attempt = 0
+    while True:
+        upstream_breaker.before_call()
+        remaining = deadline - time.monotonic()
+        timeout = httpx.Timeout(
+            min(config.UPSTREAM_READ_TIMEOUT, remaining), connect=min(config.UPSTREAM_CONNECT_TIMEOUT, remaining)
+        )
+        error = response = None
+        try:
+            # httpx timeouts are per phase (connect, each read), so bound the whole attempt too
+            response = await asyncio.wait_for(_first_response(client, url, params, timeout), max(remaining, 0.0))
+        except asyncio.TimeoutError:
+            error = httpx.TimeoutException("Open-Meteo attempt ran past the upstream budget")
+            upstream_breaker.record_failure()
+        except httpx.TransportError as exc:
+            error = exc
+            upstream_breaker.record_failure()
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                upstream_breaker.record_success()
+                response.raise_for_status()
+                return response
+            upstream_breaker.record_failure()
+
+        delay = config.UPSTREAM_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5)
+        if attempt >= config.UPSTREAM_RETRIES or time.monotonic() + delay >= deadline:
+            if error is not None:
+                raise error
+            response.raise_for_status()
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """FastAPI dependency returning the app's shared upstream client."""
+    return request.app.state.http_client
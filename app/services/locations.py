@@ -1,6 +1,16 @@
-from app.models.schemas import Location
+import json
+import math
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
 from urllib.parse import quote_plus
-from typing import Literal, Optional
+
+from pydantic import TypeAdapter
+
+from app import config
+from app.models.schemas import Location
+from app.services.http_cache import content_etag
 
 
 def _search_url(name: str) -> str:
@@ -9,229 +19,203 @@ def _search_url(name: str) -> str:
     return f"https://www.alltrails.com/search?q={query}"
 
 
-Mode = Literal["callum", "robert"]
-
-# All hiking locations with user flag
-ALL_LOCATIONS: list[Location] = [
-    # ============ CALLUM LOCATIONS (E7 0AR - East London) ============
-    # Forest Hikes
-    Location(
-        id=1, name="Epping Forest", latitude=51.6571, longitude=0.0413,
-        type="forest", description="Ancient woodland with diverse wildlife and varied trails through beech and oak trees.",
-        drive_time="30 min", walk_url=_search_url("Epping Forest"), user="callum"
-    ),
-    Location(
-        id=2, name="Hainault Forest", latitude=51.6197, longitude=0.1242,
-        type="forest", description="Country park with woodland walks, lake, and open grassland areas.",
-        drive_time="25 min", walk_url=_search_url("Hainault Forest"), user="callum"
-    ),
-    Location(
-        id=3, name="Burnham Beeches", latitude=51.5561, longitude=-0.6455,
-        type="forest", description="National Nature Reserve with ancient pollarded beech trees and peaceful woodland paths.",
-        drive_time="1hr 15min", walk_url=_search_url("Burnham Beeches"), user="callum"
-    ),
-    Location(
-        id=4, name="Ashdown Forest", latitude=51.0410, longitude=0.0755,
-        type="forest", description="Inspiration for Hundred Acre Wood, featuring heathland and woodland trails.",
-        drive_time="1hr 30min", walk_url=_search_url("Ashdown Forest"), user="callum"
-    ),
-    Location(
-        id=5, name="Box Hill", latitude=51.2487, longitude=-0.3136,
-        type="forest", description="Surrey Hills beauty spot with stunning viewpoints and chalk downland walks.",
-        drive_time="1hr 15min", walk_url=_search_url("Box Hill Surrey"), user="callum"
-    ),
-    Location(
-        id=6, name="Leith Hill", latitude=51.1769, longitude=-0.3697,
-        type="forest", description="Highest point in Southeast England with a Victorian tower and woodland trails.",
-        drive_time="1hr 20min", walk_url=_search_url("Leith Hill"), user="callum"
-    ),
-    Location(
-        id=7, name="Wendover Woods", latitude=51.7717, longitude=-0.7115,
-        type="forest", description="Chiltern Hills forest with waymarked trails, Go Ape, and scenic viewpoints.",
-        drive_time="1hr 30min", walk_url=_search_url("Wendover Woods"), user="callum"
-    ),
-    Location(
-        id=8, name="Chess Valley", latitude=51.7040, longitude=-0.6122,
-        type="forest", description="Picturesque Chilterns valley with riverside walks and charming villages.",
-        drive_time="1hr 20min", walk_url=_search_url("Chess Valley Chilterns"), user="callum"
-    ),
-    Location(
-        id=9, name="Bedgebury Pinetum", latitude=51.0706, longitude=0.4536,
-        type="forest", description="National Pinetum with world-class conifer collection and family-friendly trails.",
-        drive_time="1hr 30min", walk_url=_search_url("Bedgebury Pinetum"), user="callum"
-    ),
-    Location(
-        id=10, name="Holmwood Common", latitude=51.1805, longitude=-0.3210,
-        type="forest", description="Surrey woodland common with peaceful paths through oak and birch trees.",
-        drive_time="1hr 20min", walk_url=_search_url("Holmwood Common Surrey"), user="callum"
-    ),
-    # Coastal Hikes
-    Location(
-        id=11, name="White Cliffs of Dover", latitude=51.1370, longitude=1.3657,
-        type="coastal", description="Iconic chalk cliffs with spectacular sea views and clifftop walking paths.",
-        drive_time="1hr 45min", walk_url=_search_url("White Cliffs Dover"), user="callum"
-    ),
-    Location(
-        id=12, name="Seven Sisters", latitude=50.7743, longitude=0.1530,
-        type="coastal", description="Dramatic chalk cliffs along the South Downs Way with sweeping coastal views.",
-        drive_time="1hr 45min", walk_url=_search_url("Seven Sisters Cliffs"), user="callum"
-    ),
-    Location(
-        id=13, name="Beachy Head", latitude=50.7374, longitude=0.2477,
-        type="coastal", description="England's highest chalk sea cliff with panoramic views and lighthouse below.",
-        drive_time="1hr 50min", walk_url=_search_url("Beachy Head"), user="callum"
-    ),
-    Location(
-        id=14, name="Thanet Coast", latitude=51.3355, longitude=1.4199,
-        type="coastal", description="Coastal path through seaside towns with sandy bays and chalk stacks.",
-        drive_time="1hr 40min", walk_url=_search_url("Thanet Coast Broadstairs"), user="callum"
-    ),
-    Location(
-        id=15, name="Whitstable Coastal Path", latitude=51.3610, longitude=1.0243,
-        type="coastal", description="Seaside walk past oyster beds, beach huts, and the famous harbour.",
-        drive_time="1hr 30min", walk_url=_search_url("Whitstable"), user="callum"
-    ),
-    Location(
-        id=16, name="Leigh-on-Sea Estuary", latitude=51.5500, longitude=0.6460,
-        type="coastal", description="Thames estuary walks with mudflats, cockle sheds, and birdwatching.",
-        drive_time="50 min", walk_url=_search_url("Leigh-on-Sea Two Tree Island"), user="callum"
-    ),
-    Location(
-        id=17, name="Southend-on-Sea", latitude=51.5378, longitude=0.7143,
-        type="coastal", description="Classic seaside resort with the world's longest pleasure pier and esplanade walks.",
-        drive_time="55 min", walk_url=_search_url("Southend-on-Sea"), user="callum"
-    ),
-    Location(
-        id=18, name="Wivenhoe Trail", latitude=51.8580, longitude=0.9653,
-        type="coastal", description="Riverside walk along the Colne estuary with boats, wildlife, and historic quay.",
-        drive_time="1hr 20min", walk_url=_search_url("Wivenhoe Essex"), user="callum"
-    ),
-    Location(
-        id=19, name="Devil's Dyke", latitude=50.8828, longitude=-0.2146,
-        type="coastal", description="South Downs valley with far-reaching views to the sea and rolling hills.",
-        drive_time="1hr 40min", walk_url=_search_url("Devil's Dyke Brighton"), user="callum"
-    ),
-    Location(
-        id=20, name="Ditchling Beacon", latitude=50.9019, longitude=-0.1074,
-        type="coastal", description="South Downs summit with expansive views over the Weald and towards the coast.",
-        drive_time="1hr 45min", walk_url=_search_url("Ditchling Beacon"), user="callum"
-    ),
-
-    # ============ ROBERT LOCATIONS (WA12 9US - Newton-le-Willows) ============
-    # Forest/Woodland Hikes
-    Location(
-        id=21, name="Delamere Forest", latitude=53.2283, longitude=-2.6842,
-        type="forest", description="Cheshire's largest woodland with waymarked trails through pine and broadleaf trees.",
-        drive_time="30 min", walk_url=_search_url("Delamere Forest"), user="robert"
-    ),
-    Location(
-        id=22, name="Rivington Pike", latitude=53.6267, longitude=-2.5525,
-        type="forest", description="Historic pike tower atop West Pennine Moors with stunning views over Lancashire.",
-        drive_time="25 min", walk_url=_search_url("Rivington Pike"), user="robert"
-    ),
-    Location(
-        id=23, name="Alderley Edge", latitude=53.2980, longitude=-2.2280,
-        type="forest", description="Dramatic red sandstone escarpment with woodland trails and legends of wizards.",
-        drive_time="40 min", walk_url=_search_url("Alderley Edge"), user="robert"
-    ),
-    Location(
-        id=24, name="Lyme Park", latitude=53.3385, longitude=-2.0548,
-        type="forest", description="National Trust estate with deer park, woodland walks, and Pemberley from Pride and Prejudice.",
-        drive_time="50 min", walk_url=_search_url("Lyme Park Disley"), user="robert"
-    ),
-    Location(
-        id=25, name="Macclesfield Forest", latitude=53.2600, longitude=-2.0150,
-        type="forest", description="Peaceful conifer forest on the edge of the Peak District with reservoir views.",
-        drive_time="55 min", walk_url=_search_url("Macclesfield Forest"), user="robert"
-    ),
-    Location(
-        id=26, name="Tegg's Nose", latitude=53.2544, longitude=-2.0790,
-        type="forest", description="Country park with panoramic Peak District views and old quarry workings to explore.",
-        drive_time="50 min", walk_url=_search_url("Tegg's Nose Macclesfield"), user="robert"
-    ),
-    Location(
-        id=27, name="Beacon Fell", latitude=53.8520, longitude=-2.5810,
-        type="forest", description="Lancashire country park with forest trails and sweeping views to the Lake District.",
-        drive_time="45 min", walk_url=_search_url("Beacon Fell Lancashire"), user="robert"
-    ),
-    Location(
-        id=28, name="Grizedale Forest", latitude=54.3500, longitude=-2.9840,
-        type="forest", description="Lake District forest with sculpture trails, wildlife, and mountain bike routes.",
-        drive_time="1hr 30min", walk_url=_search_url("Grizedale Forest"), user="robert"
-    ),
-    Location(
-        id=29, name="The Cloud", latitude=53.1612, longitude=-2.1988,
-        type="forest", description="Distinctive gritstone hill with heathland summit and views across Cheshire Plain.",
-        drive_time="45 min", walk_url=_search_url("The Cloud Congleton"), user="robert"
-    ),
-    Location(
-        id=30, name="Helsby Hill", latitude=53.2742, longitude=-2.7750,
-        type="forest", description="Sandstone crag with woodland trails and spectacular views over the Mersey estuary.",
-        drive_time="25 min", walk_url=_search_url("Helsby Hill"), user="robert"
-    ),
-    # Coastal/Moorland/Hills
-    Location(
-        id=31, name="Formby Beach & Pinewoods", latitude=53.5630, longitude=-3.0870,
-        type="coastal", description="Red squirrel reserve with pine forests leading to vast sandy beaches and dunes.",
-        drive_time="35 min", walk_url=_search_url("Formby Beach National Trust"), user="robert"
-    ),
-    Location(
-        id=32, name="Crosby Beach", latitude=53.4752, longitude=-3.0392,
-        type="coastal", description="Home to Antony Gormley's 'Another Place' iron men sculptures along the shoreline.",
-        drive_time="25 min", walk_url=_search_url("Crosby Beach Another Place"), user="robert"
-    ),
-    Location(
-        id=33, name="West Kirby & Hilbre Island", latitude=53.3735, longitude=-3.1830,
-        type="coastal", description="Tidal walk across the sands to Hilbre Island with seals and spectacular sunsets.",
-        drive_time="40 min", walk_url=_search_url("Hilbre Island West Kirby"), user="robert"
-    ),
-    Location(
-        id=34, name="Arnside Knott", latitude=54.1957, longitude=-2.8407,
-        type="coastal", description="Limestone hill with views over Morecambe Bay and the Lake District fells.",
-        drive_time="1hr 15min", walk_url=_search_url("Arnside Knott"), user="robert"
-    ),
-    Location(
-        id=35, name="Silverdale", latitude=54.1700, longitude=-2.8230,
-        type="coastal", description="AONB with limestone pavements, woodland, and stunning Morecambe Bay views.",
-        drive_time="1hr 10min", walk_url=_search_url("Silverdale Lancashire"), user="robert"
-    ),
-    Location(
-        id=36, name="Mam Tor", latitude=53.3490, longitude=-1.8098,
-        type="coastal", description="The 'Shivering Mountain' with ridge walks and spectacular Peak District panoramas.",
-        drive_time="1hr 10min", walk_url=_search_url("Mam Tor Peak District"), user="robert"
-    ),
-    Location(
-        id=37, name="Kinder Scout", latitude=53.3870, longitude=-1.8760,
-        type="coastal", description="Highest point in the Peak District with moorland plateau and historic mass trespass route.",
-        drive_time="1hr 15min", walk_url=_search_url("Kinder Scout"), user="robert"
-    ),
-    Location(
-        id=38, name="Stanage Edge", latitude=53.3486, longitude=-1.6315,
-        type="coastal", description="Dramatic gritstone edge popular with climbers, with sweeping moorland views.",
-        drive_time="1hr 20min", walk_url=_search_url("Stanage Edge"), user="robert"
-    ),
-    Location(
-        id=39, name="Malham Cove", latitude=54.0720, longitude=-2.1566,
-        type="coastal", description="Stunning curved limestone cliff with pavement on top and waterfall after rain.",
-        drive_time="1hr 30min", walk_url=_search_url("Malham Cove Yorkshire"), user="robert"
-    ),
-    Location(
-        id=40, name="Ingleton Waterfalls", latitude=54.1560, longitude=-2.4650,
-        type="coastal", description="Classic waterfall trail through ancient woodland in the Yorkshire Dales.",
-        drive_time="1hr 20min", walk_url=_search_url("Ingleton Waterfalls Trail"), user="robert"
-    ),
-]
-
-
-def get_all_locations(mode: Mode = "callum") -> list[Location]:
+# A region id from the registry (see app/services/regions.py)
+Mode = str
+
+# The built-in catalogue, in the same GeoJSON format as HIKING_LOCATIONS_FILE
+CATALOGUE_FILE = Path(__file__).resolve().parent.parent / "data" / "locations.geojson"
+
+
+class LocationRecord(NamedTuple):
+    """
+    A hike in the catalogue. A plain tuple rather than the Location schema,
+    so a large catalogue loads quickly and is never validated twice; the
+    fields match the schema's, in the same order.
+    """
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+    type: str
+    description: str
+    drive_time: str
+    walk_url: str
+    user: str
+
+
+# Mean Earth radius and km per degree of latitude, for distance calculations
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Spatial index bucket size in degrees (~28km north-south)
+BUCKET_DEGREES = 0.25
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in km."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+# Checks a whole user-supplied catalogue in one call
+_LOCATION_LIST = TypeAdapter(list[Location])
+
+
+def load_locations_geojson(path: Path, validate: bool = True) -> list[LocationRecord]:
+    """
+    Load locations from a GeoJSON FeatureCollection of Points. Each feature's
+    properties supply the remaining Location fields (walk_url defaults to an
+    AllTrails search for the name). User-supplied files are checked against
+    the Location schema; the built-in catalogue skips that.
+    """
+    with open(path, encoding="utf-8") as f:
+        collection = json.load(f)
+
+    entries = []
+    for feature in collection["features"]:
+        lon, lat = feature["geometry"]["coordinates"][:2]
+        props = dict(feature["properties"], latitude=lat, longitude=lon)
+        if "walk_url" not in props:
+            props["walk_url"] = _search_url(props["name"])
+        entries.append(props)
+    if validate:
+        entries = [loc.__dict__ for loc in _LOCATION_LIST.validate_python(entries)]
+    return [LocationRecord(*(props[field] for field in LocationRecord._fields)) for props in entries]
+
+
+class LocationIndex:
+    """
+    Locations indexed once for fast lookups: a list per mode, a dict by id,
+    and a grid-bucket spatial index for nearest-neighbour and range queries.
+    """
+
+    def __init__(self, locations: Iterable[LocationRecord], bucket_degrees: float = BUCKET_DEGREES):
+        self.bucket_degrees = bucket_degrees
+        self.by_mode: dict[str, list[LocationRecord]] = defaultdict(list)
+        self.by_id: dict[int, LocationRecord] = {}
+        self.buckets: dict[tuple[int, int], list[LocationRecord]] = defaultdict(list)
+        self._json: dict[str, tuple[bytes, str]] = {}
+
+        for loc in locations:
+            self.by_mode[loc.user].append(loc)
+            self.by_id[loc.id] = loc
+            self.buckets[self._bucket(loc.latitude, loc.longitude)].append(loc)
+
+        keys = list(self.buckets) or [(0, 0)]
+        self._row_range = (min(k[0] for k in keys), max(k[0] for k in keys))
+        self._col_range = (min(k[1] for k in keys), max(k[1] for k in keys))
+
+    def locations_json(self, mode: str) -> tuple[bytes, str]:
+        """
+        The /api/locations body for a mode and its ETag, built on first use.
+        Same bytes as LocationsResponse.model_dump_json() without building the
+        models.
+        """
+        cached = self._json.get(mode)
+        if cached is None:
+            payload = {"locations": [loc._asdict() for loc in self.by_mode.get(mode, [])]}
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+            cached = self._json[mode] = (body, content_etag(body))
+        return cached
+
+    def _bucket(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.bucket_degrees), math.floor(lon / self.bucket_degrees)
+
+    def _ring(self, row: int, col: int, radius: int) -> Iterable[list[LocationRecord]]:
+        """Buckets at Chebyshev distance `radius` from (row, col)."""
+        if radius == 0:
+            yield self.buckets.get((row, col), [])
+            return
+        for r in range(row - radius, row + radius + 1):
+            if r in (row - radius, row + radius):
+                cols = range(col - radius, col + radius + 1)
+            else:
+                cols = (col - radius, col + radius)
+            for c in cols:
+                bucket = self.buckets.get((r, c))
+                if bucket:
+                    yield bucket
+
+    def nearest(self, lat: float, lon: float, n: int = 5, mode: Optional[str] = None) -> list[tuple[LocationRecord, float]]:
+        """The n locations closest to (lat, lon) with their distances in km, nearest first."""
+        row, col = self._bucket(lat, lon)
+        max_radius = max(
+            abs(row - self._row_range[0]), abs(row - self._row_range[1]),
+            abs(col - self._col_range[0]), abs(col - self._col_range[1]),
+        )
+        found: list[tuple[float, int, LocationRecord]] = []
+        for radius in range(max_radius + 1):
+            for bucket in self._ring(row, col, radius):
+                for loc in bucket:
+                    if mode is None or loc.user == mode:
+                        found.append((haversine_km(lat, lon, loc.latitude, loc.longitude), loc.id, loc))
+            if len(found) >= n:
+                # Anything in a bucket further out is at least this far away
+                # (longitude degrees shrink towards the poles, so be conservative)
+                far_lat = min(89.0, abs(lat) + (radius + 1) * self.bucket_degrees)
+                bound_km = radius * self.bucket_degrees * KM_PER_DEGREE * math.cos(math.radians(far_lat))
+                found.sort()
+                if found[n - 1][0] <= bound_km:
+                    break
+        found.sort()
+        return [(loc, distance) for distance, _, loc in found[:n]]
+
+    def within_bbox(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, mode: Optional[str] = None
+    ) -> list[LocationRecord]:
+        """Locations inside a lat/lon bounding box."""
+        row0, col0 = self._bucket(min_lat, min_lon)
+        row1, col1 = self._bucket(max_lat, max_lon)
+        row0, row1 = max(row0, self._row_range[0]), min(row1, self._row_range[1])
+        col0, col1 = max(col0, self._col_range[0]), min(col1, self._col_range[1])
+        results = []
+        for r in range(row0, row1 + 1):
+            for c in range(col0, col1 + 1):
+                for loc in self.buckets.get((r, c), ()):
+                    if (
+                        (mode is None or loc.user == mode)
+                        and min_lat <= loc.latitude <= max_lat
+                        and min_lon <= loc.longitude <= max_lon
+                    ):
+                        results.append(loc)
+        return results
+
+    def within_radius(
+        self, lat: float, lon: float, radius_km: float, mode: Optional[str] = None
+    ) -> list[tuple[LocationRecord, float]]:
+        """Locations within radius_km of (lat, lon) with their distances, nearest first."""
+        lat_delta = radius_km / KM_PER_DEGREE
+        cos_lat = math.cos(math.radians(min(89.0, abs(lat) + lat_delta)))
+        lon_delta = min(180.0, radius_km / (KM_PER_DEGREE * max(cos_lat, 1e-6)))
+        candidates = self.within_bbox(lat - lat_delta, lon - lon_delta, lat + lat_delta, lon + lon_delta, mode)
+        results = [(loc, haversine_km(lat, lon, loc.latitude, loc.longitude)) for loc in candidates]
+        return sorted((r for r in results if r[1] <= radius_km), key=lambda r: (r[1], r[0].id))
+
+
+@lru_cache(maxsize=None)
+def get_location_index() -> LocationIndex:
+    """
+    The catalogue (built-in plus HIKING_LOCATIONS_FILE), loaded and indexed on
+    first use rather than at import, so startup does not grow with it.
+    """
+    locations = load_locations_geojson(CATALOGUE_FILE, validate=False)
+    if config.LOCATIONS_FILE:
+        locations.extend(load_locations_geojson(Path(config.LOCATIONS_FILE)))
+    return LocationIndex(locations)
+
+
+def get_all_locations(mode: Mode = "callum") -> list[LocationRecord]:
     """Get all locations for the specified user."""
-    return [loc for loc in ALL_LOCATIONS if loc.user == mode]
+    return get_location_index().by_mode.get(mode, [])
 
 
-def get_location_by_id(location_id: int, mode: Mode = "callum") -> Optional[Location]:
+def get_location_by_id(location_id: int, mode: Mode = "callum") -> Optional[LocationRecord]:
     """Get a specific location by ID for the specified user."""
-    locations = get_all_locations(mode)
-    for loc in locations:
-        if loc.id == location_id:
-            return loc
+    loc = get_location_index().by_id.get(location_id)
+    if loc is not None and loc.user == mode:
+        return loc
     return None
@@ -0,0 +1,60 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # On Windows: locks become no-ops and each worker fetches for itself
+    fcntl = None
+
+# How often a waiting worker retries a held lock
+POLL_SECONDS = 0.05
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a file, used to elect one worker process to do
+    a piece of work (e.g. an upstream fetch) while the others wait for it.
+
+    Every acquisition opens its own file descriptor, so the lock also
+    excludes other tasks in the same process. Acquiring polls rather than
+    blocking a thread, so a cancelled waiter never leaves a lock held.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        """Take the lock if it is free; returns whether this holder now owns it."""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    async def acquire(self) -> None:
+        while not self.try_acquire():
+            await asyncio.sleep(POLL_SECONDS)
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    async def __aenter__(self) -> "FileLock":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
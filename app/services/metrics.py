@@ -0,0 +1,198 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from app import config
+
+# Latency buckets in seconds, from sub-millisecond post-processing up to slow upstream calls
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000)
+POINTS_BUCKETS = (1, 10, 25, 50, 100, 200, 500, 1000)
+
+
+class Histogram:
+    """
+    A Prometheus-style histogram with optional labels.
+
+    Observations are only ever made from the event loop thread, so the
+    counters are plain lists without locking.
+    """
+
+    def __init__(self, name: str, help: str, buckets: tuple, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.labels = labels
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = [f'{k}="{v}"' for k, v in zip(self.labels, label_values)]
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                bucket_labels = ",".join([*labels, f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f'{{{",".join(labels)}}}' if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class Counter:
+    """A Prometheus-style counter with optional labels."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, label_values))
+            lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return lines
+
+
+http_request_seconds = Histogram(
+    "hiking_http_request_duration_seconds", "Time to the start of the response, by route.",
+    SECONDS_BUCKETS, ("method", "route", "status"),
+)
+stage_seconds = Histogram(
+    "hiking_stage_duration_seconds", "Time spent in each stage of serving a request.",
+    SECONDS_BUCKETS, ("stage",),
+)
+upstream_response_bytes = Histogram(
+    "hiking_upstream_response_bytes", "Size of Open-Meteo response bodies.", BYTES_BUCKETS,
+)
+upstream_points = Histogram(
+    "hiking_upstream_points_per_request", "Coordinates asked for per Open-Meteo request.", POINTS_BUCKETS,
+)
+cache_lookups = Counter(
+    "hiking_cache_lookups_total", "Cache lookups by cache and outcome.", ("cache", "outcome"),
+)
+
+upstream_events = Counter(
+    "hiking_upstream_events_total", "Circuit breaker, hedging and degraded-serving events.", ("event",),
+)
+
+REGISTRY = [http_request_seconds, stage_seconds, upstream_response_bytes, upstream_points, cache_lookups, upstream_events]
+
+# Server-Timing entries for the request being handled, set by MetricsMiddleware.
+# Tasks started on behalf of a request (e.g. a cache fetch) share its list.
+_request_timings: ContextVar[Optional[list[str]]] = ContextVar("request_timings", default=None)
+
+
+class _StageTimer:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> "_StageTimer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.started
+        stage_seconds.observe(elapsed, self.stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append(f"{self.stage};dur={elapsed * 1000:.2f}")
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopTimer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NOOP = _NoopTimer()
+
+
+def timed(stage: str):
+    """Context manager recording how long a stage took, in the histogram and the Server-Timing header."""
+    return _StageTimer(stage) if config.METRICS_ENABLED else _NOOP
+
+
+def observe_upstream_response(points: int, size: int) -> None:
+    if config.METRICS_ENABLED:
+        upstream_points.observe(points)
+        upstream_response_bytes.observe(size)
+
+
+def record_cache_lookup(cache: str, outcome: str, count: int = 1) -> None:
+    """Count `count` lookups with this outcome and note it in the Server-Timing header."""
+    if config.METRICS_ENABLED and count:
+        cache_lookups.inc(cache, outcome, amount=count)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append(f'cache-{cache};desc="{outcome}"' if count == 1 else f'cache-{cache};desc="{outcome} x{count}"')
+
+
+def record_upstream_event(event: str) -> None:
+    """Count a resilience event and note it in the Server-Timing header."""
+    if config.METRICS_ENABLED:
+        upstream_events.inc(event)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append(f'upstream;desc="{event}"')
+
+
+def render_metrics() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by route and, if enabled,
+    adding a Server-Timing header with the stages recorded while handling it.
+    Only installed when metrics are enabled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: list[str] = []
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - started
+                route = getattr(scope.get("route"), "path", "unmatched")
+                http_request_seconds.observe(elapsed, scope["method"], route, str(message["status"]))
+                if config.SERVER_TIMING_ENABLED:
+                    timings.append(f"total;dur={elapsed * 1000:.2f}")
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", ", ".join(timings).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
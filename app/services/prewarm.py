@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Optional
+
+import httpx
+
+from app import config
+from app.models.schemas import HealthResponse, ModeHealth
+from app.services.locking import FileLock
+from app.services.regions import REGIONS
+from app.services.resilience import upstream_breaker
+from app.services.store import get_store
+from app.services.weather import (
+    FORECAST_TTL_SECONDS,
+    Mode,
+    get_forecast,
+    isoformat_timestamp,
+    peek_forecast,
+    stored_forecast_time,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Prewarmer:
+    """
+    Background task that keeps every mode's forecast horizon warm in the cache,
+    so visitors are served from memory instead of waiting on Open-Meteo.
+    """
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(config.PREWARM_CONCURRENCY)
+        self.failures: dict[str, int] = {mode: 0 for mode in REGIONS}
+        self.last_error: dict[str, Optional[str]] = {mode: None for mode in REGIONS}
+        self._task: Optional[asyncio.Task] = None
+        self.leader = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self) -> None:
+        lock = self.leader_lock()
+        try:
+            while True:
+                # With several worker processes only the lock holder pre-warms;
+                # the rest keep checking so one takes over if the leader exits
+                if lock is None or lock.try_acquire():
+                    self.leader = True
+                    await self.refresh_all()
+                    await asyncio.sleep(self.next_delay())
+                else:
+                    await asyncio.sleep(config.PREWARM_INTERVAL_SECONDS / 4)
+        finally:
+            self.leader = False
+            if lock is not None:
+                lock.release()
+
+    @staticmethod
+    def leader_lock() -> Optional[FileLock]:
+        store = get_store()
+        return FileLock(store.path.parent / "locks" / "prewarm.lock") if store is not None else None
+
+    async def refresh_all(self) -> None:
+        """Refresh every mode's full forecast horizon that is due, a few at a time, then compact the store."""
+        await asyncio.gather(*(self.refresh_mode(mode) for mode in REGIONS))
+        store = get_store()
+        if store is not None:
+            try:
+                await asyncio.to_thread(store.compact)
+            except Exception as exc:
+                logger.warning("Forecast store compaction failed: %s", exc)
+
+    async def refresh_mode(self, mode: Mode) -> None:
+        """
+        Warm a mode from memory or the shared store (e.g. just after a
+        restart) and only go upstream if that forecast would expire before
+        the next pass.
+        """
+        async with self.semaphore:
+            try:
+                entry = await get_forecast(self.client, mode)
+                if entry.stale or entry.age >= self.refresh_age():
+                    await get_forecast(self.client, mode, refresh=True)
+            except Exception as exc:
+                self.failures[mode] += 1
+                self.last_error[mode] = f"{type(exc).__name__}: {exc}"
+                logger.warning("Forecast pre-warm failed for %s (attempt %d): %s", mode, self.failures[mode], exc)
+            else:
+                self.failures[mode] = 0
+                self.last_error[mode] = None
+
+    @staticmethod
+    def refresh_age() -> float:
+        """Age at which a forecast is refetched: older ones would expire before the next pass."""
+        return FORECAST_TTL_SECONDS - config.PREWARM_INTERVAL_SECONDS - config.PREWARM_JITTER_SECONDS
+
+    def next_delay(self) -> float:
+        """Seconds until the next run: the schedule interval, or exponential backoff after failures."""
+        failures = max(self.failures.values(), default=0)
+        if failures:
+            delay = min(config.PREWARM_RETRY_SECONDS * 2 ** (failures - 1), config.PREWARM_MAX_BACKOFF_SECONDS)
+            delay = min(delay, config.PREWARM_INTERVAL_SECONDS)
+        else:
+            delay = config.PREWARM_INTERVAL_SECONDS
+        # Jitter keeps a fleet of instances from hitting Open-Meteo in lockstep
+        return max(0.0, delay + random.uniform(-config.PREWARM_JITTER_SECONDS, config.PREWARM_JITTER_SECONDS))
+
+
+def forecast_health(prewarmer: Optional[Prewarmer]) -> HealthResponse:
+    """
+    Summarise how fresh today's forecast is for each mode: the newer of this
+    worker's cached copy and the one in the shared store, so every worker
+    gives the same answer whichever of them pre-warms.
+    """
+    modes = []
+    for mode in REGIONS:
+        entry = peek_forecast(mode)
+        fetched = [stored_forecast_time(mode)] + ([entry.fetched_at] if entry is not None else [])
+        fetched_at = max((t for t in fetched if t is not None), default=None)
+        age = time.time() - fetched_at if fetched_at is not None else None
+        modes.append(ModeHealth(
+            mode=mode,
+            refreshed_at=isoformat_timestamp(fetched_at) if fetched_at is not None else None,
+            age_seconds=round(age, 1) if age is not None else None,
+            fresh=age is not None and age < FORECAST_TTL_SECONDS,
+            consecutive_failures=prewarmer.failures[mode] if prewarmer else 0,
+            last_error=prewarmer.last_error[mode] if prewarmer else None
+        ))
+
+    if all(m.fresh for m in modes):
+        status = "ok"
+    elif any(m.refreshed_at for m in modes):
+        status = "stale"
+    else:
+        status = "empty"
+    return HealthResponse(
+        status=status,
+        prewarm_enabled=prewarmer is not None,
+        prewarm_role=None if prewarmer is None else "leader" if prewarmer.leader else "standby",
+        upstream_circuit=upstream_breaker.state,
+        modes=modes
+    )
@@ -0,0 +1,97 @@
+import heapq
+from datetime import date, timedelta
+
+import httpx
+import numpy as np
+
+from app.models.schemas import RankedLocation
+from app.services.weather import (
+    HOURS_PER_DAY,
+    WALK_END_HOUR,
+    WALK_START_HOUR,
+    Mode,
+    get_location_forecast,
+)
+
+# Score = dry walking hours + LONGEST_DRY_WEIGHT * longest dry window (hours)
+#         - RAIN_WEIGHT * total walking-hour rain (mm)
+LONGEST_DRY_WEIGHT = 1.0
+RAIN_WEIGHT = 2.0
+
+
+def longest_dry_run(dry: np.ndarray) -> np.ndarray:
+    """Longest run of consecutive True values along the last axis."""
+    run = np.zeros(dry.shape[:-1], dtype=np.int32)
+    best = np.zeros_like(run)
+    for hour in range(dry.shape[-1]):
+        run = (run + 1) * dry[..., hour]
+        np.maximum(best, run, out=best)
+    return best
+
+
+def score_walking_hours(walking: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Score each location's walking hours, given as a locations x days x hours
+    array. Dry windows never span overnight.
+    """
+    daily_mm = walking.sum(axis=2, dtype=np.float64)
+    dry = walking <= 0
+    daily_dry = dry.sum(axis=2)
+    daily_longest = longest_dry_run(dry)
+
+    total_mm = daily_mm.sum(axis=1)
+    dry_hours = daily_dry.sum(axis=1)
+    longest = daily_longest.max(axis=1)
+    # Best day: least rain, then most dry hours, then earliest (lexsort keys are last-first)
+    order = np.lexsort((-daily_dry, daily_mm))
+    return {
+        "score": dry_hours + LONGEST_DRY_WEIGHT * longest - RAIN_WEIGHT * total_mm,
+        "total_mm": total_mm,
+        "dry_hours": dry_hours,
+        "longest_dry_hours": longest,
+        "best_day": order[:, 0],
+    }
+
+
+async def rank_locations(
+    client: httpx.AsyncClient,
+    mode: Mode,
+    from_date: date,
+    to_date: date,
+    k: int = 5
+) -> tuple[list[RankedLocation], float]:
+    """
+    Rank the mode's locations by how dry their walking hours are between
+    from_date and to_date (inclusive), all from one cached forecast fetch.
+    Returns the top k and when the forecast was fetched. Raises ValueError
+    if the dates fall outside the forecast horizon.
+    """
+    locations, horizon, fetched_at = await get_location_forecast(client, mode)
+    first_day = (from_date - horizon.start_date).days
+    last_day = (to_date - horizon.start_date).days
+    if first_day < 0 or last_day >= horizon.days or first_day > last_day:
+        end = horizon.start_date + timedelta(days=horizon.days - 1)
+        raise ValueError(f"Dates must be within {horizon.start_date.isoformat()} to {end.isoformat()}, from <= to")
+
+    days = horizon.hourly[:, first_day * HOURS_PER_DAY:(last_day + 1) * HOURS_PER_DAY]
+    walking = days.reshape(len(locations), last_day - first_day + 1, HOURS_PER_DAY)[:, :, WALK_START_HOUR:WALK_END_HOUR + 1]
+    scores = score_walking_hours(walking)
+
+    # Heap-based top-k keeps this O(n log k) for large catalogues; ties go to the lower id
+    top = heapq.nlargest(
+        k,
+        range(len(locations)),
+        key=lambda i: (scores["score"][i], -locations[i].id)
+    )
+    return [
+        RankedLocation(
+            location_id=locations[i].id,
+            name=locations[i].name,
+            score=round(float(scores["score"][i]), 2),
+            total_mm=round(float(scores["total_mm"][i]), 2),
+            dry_hours=int(scores["dry_hours"][i]),
+            longest_dry_hours=int(scores["longest_dry_hours"][i]),
+            best_date=(from_date + timedelta(days=int(scores["best_day"][i]))).isoformat()
+        )
+        for i in top
+    ], fetched_at
@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from app import config
+from app.services.locations import get_all_locations
+
+# The original two home bases. Their boxes were drawn by hand around every
+# hike within a two-hour drive, so they are kept rather than computed.
+BUILTIN_REGIONS = [
+    {"id": "callum", "name": "Callum", "area": "East London", "bbox": [50.7, -0.8, 51.9, 1.5]},
+    {"id": "robert", "name": "Robert", "area": "Newton-le-Willows", "bbox": [53.1, -3.2, 54.4, -1.5]},
+]
+
+DEFAULT_REGION = "callum"
+
+
+class Region(NamedTuple):
+    """A home base (user mode): its hikes and the bounding box its rain grid covers."""
+    id: str
+    name: str
+    area: str
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+    home: Optional[tuple[float, float]] = None
+
+
+def region_from_config(entry: dict) -> Region:
+    """
+    Build a region from a registry entry. Without an explicit "bbox"
+    ([min_lat, min_lon, max_lat, max_lon]) the box is computed from the
+    region's locations and optional "home" point, padded by
+    REGION_PADDING_DEGREES.
+    """
+    home = tuple(entry["home"]) if entry.get("home") else None
+    if entry.get("bbox"):
+        min_lat, min_lon, max_lat, max_lon = entry["bbox"]
+    else:
+        points = [(loc.latitude, loc.longitude) for loc in get_all_locations(entry["id"])]
+        if home is not None:
+            points.append(home)
+        if not points:
+            raise ValueError(f"Region {entry['id']!r} needs a bbox, a home point or some locations")
+        pad = config.REGION_PADDING_DEGREES
+        min_lat = min(p[0] for p in points) - pad
+        max_lat = max(p[0] for p in points) + pad
+        min_lon = min(p[1] for p in points) - pad
+        max_lon = max(p[1] for p in points) + pad
+    return Region(
+        id=entry["id"],
+        name=entry.get("name", entry["id"].title()),
+        area=entry.get("area", ""),
+        min_lat=min_lat,
+        min_lon=min_lon,
+        max_lat=max_lat,
+        max_lon=max_lon,
+        home=home,
+    )
+
+
+def load_regions(path: Optional[Path] = None) -> dict[str, Region]:
+    """The built-in regions plus any from a JSON list of entries in `path` (same id replaces)."""
+    entries = {entry["id"]: entry for entry in BUILTIN_REGIONS}
+    if path is not None:
+        with open(path, encoding="utf-8") as f:
+            entries.update((entry["id"], entry) for entry in json.load(f))
+    return {region_id: region_from_config(entry) for region_id, entry in entries.items()}
+
+
+REGIONS = load_regions(Path(config.REGIONS_FILE) if config.REGIONS_FILE else None)
+
+
+def get_region(region_id: str) -> Region:
+    """Look up a region; raises KeyError for unknown ids."""
+    return REGIONS[region_id]
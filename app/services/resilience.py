@@ -0,0 +1,103 @@
+import logging
+import time
+from collections import deque
+from typing import Literal, Optional
+
+from app import config
+from app.services.metrics import record_upstream_event
+
+logger = logging.getLogger(__name__)
+
+CircuitState = Literal["closed", "open", "half-open"]
+
+# Recent upstream latencies kept for the hedging threshold, and how many are
+# needed before hedging starts
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+
+
+class UpstreamUnavailable(Exception):
+    """Open-Meteo is failing or too slow, and there is no forecast to fall back on."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Fails upstream calls fast while Open-Meteo is down.
+
+    After `failure_threshold` failures in a row the circuit opens and calls
+    raise UpstreamUnavailable without going out. Every `reset_seconds` one
+    trial call is let through (half-open): success closes the circuit, a
+    failure keeps it open for another interval.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if self._trial else "open"
+
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is allowed (0 when closed)."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_seconds - time.monotonic())
+
+    def before_call(self) -> None:
+        """Raise UpstreamUnavailable unless a call may go out now."""
+        if self._opened_at is None:
+            return
+        if self.retry_after() > 0:
+            record_upstream_event("short-circuited")
+            raise UpstreamUnavailable("Open-Meteo circuit is open", self.retry_after())
+        # Re-arm the interval, so a trial that never reports back (e.g. it was
+        # cancelled) only holds the circuit open until the next one
+        self._opened_at = time.monotonic()
+        self._trial = True
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Open-Meteo circuit closed")
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial or (self._opened_at is None and self.failures >= self.failure_threshold):
+            if self._opened_at is None:
+                logger.warning("Open-Meteo circuit opened after %d failures", self.failures)
+                record_upstream_event("circuit-opened")
+            self._opened_at = time.monotonic()
+        self._trial = False
+
+
+class LatencyWindow:
+    """The last few upstream response times, for picking when to hedge."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-th percentile in seconds, or None until enough samples are in."""
+        if len(self._samples) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+upstream_breaker = CircuitBreaker(config.UPSTREAM_BREAKER_FAILURES, config.UPSTREAM_BREAKER_RESET_SECONDS)
+upstream_latency = LatencyWindow()
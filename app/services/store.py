@@ -0,0 +1,179 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app import config
+from app.services.locking import FileLock
+
+# Rows for coordinates are read in chunks to stay well under SQLite's bound-variable limit
+_QUERY_CHUNK = 400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecasts (
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    start_date TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    run_time REAL NOT NULL,
+    hourly BLOB NOT NULL,
+    PRIMARY KEY (lat, lon, start_date, days)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS forecasts_run_time ON forecasts (run_time);
+"""
+
+
+class ForecastStore:
+    """
+    Persistent per-point forecast rows in SQLite (WAL mode), shared by every
+    worker process and surviving restarts.
+
+    Each row holds one point's hourly precipitation from start_date for `days`
+    days as a little-endian float32 blob, plus the time it was fetched
+    upstream (run_time), which stands in for the model run. Saving a point
+    replaces its previous run; compact() drops rows for past horizons and
+    runs too old to be worth serving.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def load(
+        self,
+        coords: list[tuple[float, float]],
+        start_date: date,
+        days: int,
+        max_age: float
+    ) -> dict[tuple[float, float], tuple[np.ndarray, float]]:
+        """Rows for `coords` fetched within max_age seconds, as {coord: (hourly, run_time)}."""
+        oldest = time.time() - max_age
+        found = {}
+        with self._lock:
+            for i in range(0, len(coords), _QUERY_CHUNK):
+                chunk = coords[i:i + _QUERY_CHUNK]
+                placeholders = ",".join("(?, ?)" for _ in chunk)
+                rows = self._conn.execute(
+                    "SELECT lat, lon, run_time, hourly FROM forecasts"
+                    " WHERE start_date = ? AND days = ? AND run_time >= ?"
+                    f" AND (lat, lon) IN (VALUES {placeholders})",
+                    [start_date.isoformat(), days, oldest, *(v for coord in chunk for v in coord)],
+                ).fetchall()
+                for lat, lon, run_time, blob in rows:
+                    # frombuffer reads the blob in place rather than copying it
+                    found[(lat, lon)] = (np.frombuffer(blob, dtype="<f4"), run_time)
+        return found
+
+    def oldest_run(self, coords: list[tuple[float, float]], start_date: date, days: int) -> Optional[float]:
+        """The oldest run_time among `coords`' rows, or None unless every coordinate has one."""
+        count, oldest = 0, None
+        with self._lock:
+            for i in range(0, len(coords), _QUERY_CHUNK):
+                chunk = coords[i:i + _QUERY_CHUNK]
+                placeholders = ",".join("(?, ?)" for _ in chunk)
+                found, run_time = self._conn.execute(
+                    "SELECT COUNT(*), MIN(run_time) FROM forecasts"
+                    " WHERE start_date = ? AND days = ?"
+                    f" AND (lat, lon) IN (VALUES {placeholders})",
+                    [start_date.isoformat(), days, *(v for coord in chunk for v in coord)],
+                ).fetchone()
+                count += found
+                if run_time is not None:
+                    oldest = run_time if oldest is None else min(oldest, run_time)
+        return oldest if count == len(coords) else None
+
+    def save(
+        self,
+        rows: dict[tuple[float, float], np.ndarray],
+        start_date: date,
+        days: int,
+        run_time: float
+    ) -> None:
+        """Store freshly fetched rows, replacing each point's previous run."""
+        start = start_date.isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO forecasts (lat, lon, start_date, days, run_time, hourly)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (lat, lon, start, days, run_time, row.astype("<f4", copy=False).tobytes())
+                        for (lat, lon), row in rows.items()
+                    ],
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def fetch_lock(self, start_date: date, days: int, coords: list[tuple[float, float]]) -> FileLock:
+        """
+        Cross-process lock held by whichever worker is fetching these points
+        for this horizon upstream. It is keyed by the points too, so fetches
+        for different regions and resolutions go ahead side by side.
+        """
+        digest = hashlib.blake2b(repr(coords).encode(), digest_size=8).hexdigest()
+        return FileLock(self._lock_dir / f"fetch-{start_date.isoformat()}-{days}-{digest}.lock")
+
+    @property
+    def _lock_dir(self) -> Path:
+        return self.path.parent / "locks"
+
+    def compact(self, today: Optional[date] = None, max_age: Optional[float] = None) -> int:
+        """
+        Delete rows for horizons starting before today or older than max_age,
+        and the fetch lock files for those past horizons; returns rows removed.
+        """
+        today = today or date.today()
+        max_age = config.STORE_MAX_AGE_SECONDS if max_age is None else max_age
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM forecasts WHERE start_date < ? OR run_time < ?",
+                (today.isoformat(), time.time() - max_age),
+            ).rowcount
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        # Nothing fetches a past horizon any more, so its lock files can go
+        # without pulling one out from under a holder
+        for lock_file in self._lock_dir.glob("fetch-*.lock"):
+            if lock_file.name[len("fetch-"):len("fetch-YYYY-MM-DD")] < today.isoformat():
+                lock_file.unlink(missing_ok=True)
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[ForecastStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[ForecastStore]:
+    """The process-wide forecast store, opened on first use; None if disabled."""
+    global _store
+    if not config.STORE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ForecastStore(Path(config.STORE_PATH))
+            _store.compact()
+    return _store
+
+
+def close_store() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
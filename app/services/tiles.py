@@ -0,0 +1,109 @@
+import math
+import struct
+import zlib
+
+import numpy as np
+
+from app.services.cache import ForecastCache
+from app.services.http_cache import content_etag
+from app.services.metrics import record_cache_lookup, timed
+from app.services.weather import FORECAST_TTL_SECONDS, GridSpec, Mode, WeatherSnapshot, classify_rain
+
+TILE_SIZE = 256
+MAX_ZOOM = 18
+
+# RGBA per rain class, matching getRainColor in map.js at the overlay's opacity
+RAIN_COLORS = np.array([
+    [0x00, 0xff, 0x88, 90],   # Neon green - dry
+    [0xff, 0xe6, 0x6d, 110],  # Neon yellow - light
+    [0xff, 0x6b, 0x35, 130],  # Sunset orange - moderate
+    [0xff, 0x2a, 0x6d, 150],  # Neon pink - heavy
+], dtype=np.uint8)
+
+# Rendered tiles keyed by (mode, date, resolution, forecast fetch time, z, x, y),
+# so a new forecast run never serves old pixels
+tile_cache = ForecastCache(ttl=FORECAST_TTL_SECONDS, max_entries=4096, name="tile")
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode an (h, w, 4) uint8 array as an RGBA PNG."""
+    height, width, _ = rgba.shape
+    # Each scanline starts with filter type 0 (none)
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, width * 4)], axis=1)
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)),
+        _png_chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)),
+        _png_chunk(b"IEND", b""),
+    ])
+
+
+EMPTY_TILE = encode_png(np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8))
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) of an XYZ (Web Mercator) tile."""
+    n = 2 ** z
+
+    def lat(row: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return lat(y + 1), x / n * 360 - 180, lat(y), (x + 1) / n * 360 - 180
+
+
+def render_rain_tile(grid: GridSpec, grid_totals: np.ndarray, z: int, x: int, y: int) -> bytes:
+    """
+    Render one 256x256 PNG tile of the rain overlay by bilinear interpolation
+    of the grid totals, coloured with the map's rain classes.
+    """
+    min_lat, min_lon, max_lat, max_lon = tile_bounds(z, x, y)
+    if max_lat < grid.min_lat or min_lat > grid.max_lat or max_lon < grid.min_lon or min_lon > grid.max_lon:
+        return EMPTY_TILE
+
+    # Lat/lon of each pixel centre
+    n = 2 ** z * TILE_SIZE
+    offsets = np.arange(TILE_SIZE) + 0.5
+    lons = (x * TILE_SIZE + offsets) / n * 360 - 180
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y * TILE_SIZE + offsets) / n))))
+
+    # Fractional grid indices; pixels outside the grid stay transparent
+    rows = (lats - grid.min_lat) / grid.lat_step
+    cols = (lons - grid.min_lon) / grid.lon_step
+    row_inside = (rows >= 0) & (rows <= grid.rows - 1)
+    col_inside = (cols >= 0) & (cols <= grid.cols - 1)
+
+    r0 = np.clip(np.floor(rows), 0, grid.rows - 2).astype(np.intp)
+    c0 = np.clip(np.floor(cols), 0, grid.cols - 2).astype(np.intp)
+    tr = np.clip(rows - r0, 0, 1)[:, None]
+    tc = np.clip(cols - c0, 0, 1)[None, :]
+
+    values = grid_totals.reshape(grid.rows, grid.cols)
+    r0, c0 = r0[:, None], c0[None, :]
+    mm = (
+        values[r0, c0] * (1 - tr) * (1 - tc)
+        + values[r0 + 1, c0] * tr * (1 - tc)
+        + values[r0, c0 + 1] * (1 - tr) * tc
+        + values[r0 + 1, c0 + 1] * tr * tc
+    )
+
+    rgba = RAIN_COLORS[classify_rain(mm)]
+    rgba[~(row_inside[:, None] & col_inside[None, :])] = 0
+    return encode_png(rgba)
+
+
+def get_rain_tile(snapshot: WeatherSnapshot, mode: Mode, z: int, x: int, y: int) -> tuple[bytes, str]:
+    """Return the PNG bytes and ETag for a rain tile, rendering it on first use."""
+    key = (mode, snapshot.date, snapshot.grid, snapshot.refreshed_at, z, x, y)
+    entry = tile_cache.peek(key)
+    if entry is None:
+        record_cache_lookup(tile_cache.name, "miss")
+        with timed("render"):
+            body = render_rain_tile(snapshot.grid, snapshot.grid_totals, z, x, y)
+        entry = tile_cache.put(key, (body, content_etag(body)))
+    else:
+        record_cache_lookup(tile_cache.name, "hit")
+    return entry.value
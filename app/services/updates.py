@@ -0,0 +1,142 @@
+import asyncio
+import json
+from collections import OrderedDict
+from datetime import date
+from typing import AsyncIterator, Optional
+
+import httpx
+import numpy as np
+
+from app.models.schemas import WeatherDeltaResponse
+from app.services.events import forecast_events
+from app.services.resilience import UpstreamUnavailable
+from app.services.weather import (
+    GridSpec,
+    Mode,
+    WeatherSnapshot,
+    _hourly_breakdown,
+    forecast_version,
+    get_forecast,
+    isoformat_timestamp,
+)
+
+# How many past runs are kept per (mode, date, grid) to diff against
+VERSIONS_PER_VIEW = 4
+MAX_VIEWS = 256
+
+# SSE comment sent this often so proxies keep the connection open. Each
+# heartbeat also looks the forecast up again, which refreshes a stale entry
+# (from the shared store if another worker already fetched the new run).
+HEARTBEAT_SECONDS = 15.0
+
+
+class SnapshotHistory:
+    """
+    The last few forecast runs served for each (mode, date, grid), so a
+    client that says which version it has can be sent only what changed.
+    """
+
+    def __init__(self, versions_per_view: int = VERSIONS_PER_VIEW, max_views: int = MAX_VIEWS):
+        self.versions_per_view = versions_per_view
+        self.max_views = max_views
+        self._views: OrderedDict[tuple, OrderedDict[str, WeatherSnapshot]] = OrderedDict()
+
+    def record(self, mode: Mode, snapshot: WeatherSnapshot) -> str:
+        """Remember a snapshot under its forecast version; returns the version."""
+        version = forecast_version(snapshot.refreshed_at)
+        key = (mode, snapshot.date, snapshot.grid)
+        versions = self._views.get(key)
+        if versions is None:
+            versions = self._views[key] = OrderedDict()
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        self._views.move_to_end(key)
+        if version not in versions:
+            versions[version] = snapshot
+            while len(versions) > self.versions_per_view:
+                versions.popitem(last=False)
+        return version
+
+    def get(self, mode: Mode, target_date: date, grid: GridSpec, version: str) -> Optional[WeatherSnapshot]:
+        return self._views.get((mode, target_date, grid), {}).get(version)
+
+
+snapshot_history = SnapshotHistory()
+
+
+def build_weather_delta(mode: Mode, snapshot: WeatherSnapshot, since: str) -> WeatherDeltaResponse:
+    """
+    Compare `snapshot` with the run the client has (`since`) and return only
+    the grid points and locations whose values differ. If that run is no
+    longer remembered, everything is sent with full=True.
+    """
+    version = snapshot_history.record(mode, snapshot)
+    previous = snapshot_history.get(mode, snapshot.date, snapshot.grid, since)
+    full = previous is None
+
+    if full:
+        grid_changed = np.arange(len(snapshot.grid_coords))
+        locations_changed = np.arange(len(snapshot.location_ids))
+    elif since == version:
+        grid_changed = locations_changed = np.arange(0)
+    else:
+        grid_changed = np.flatnonzero(snapshot.grid_totals != previous.grid_totals)
+        locations_changed = np.flatnonzero(
+            (snapshot.location_hours != previous.location_hours).any(axis=1)
+            | (snapshot.location_totals != previous.location_totals)
+        )
+
+    grid_totals = snapshot.grid_totals[grid_changed].tolist()
+    location_hours = snapshot.location_hours[locations_changed].tolist()
+    location_totals = snapshot.location_totals[locations_changed].tolist()
+    return WeatherDeltaResponse.model_validate({
+        "date": snapshot.date.isoformat(),
+        "version": version,
+        "since": since,
+        "full": full,
+        "grid": [
+            {"latitude": snapshot.grid_coords[i][0], "longitude": snapshot.grid_coords[i][1], "precipitation_mm": mm}
+            for i, mm in zip(grid_changed.tolist(), grid_totals)
+        ],
+        "locations": [
+            {"location_id": snapshot.location_ids[i], "hourly": _hourly_breakdown(values), "total_mm": total}
+            for i, values, total in zip(locations_changed.tolist(), location_hours, location_totals)
+        ],
+        "refreshed_at": isoformat_timestamp(snapshot.refreshed_at),
+    })
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def forecast_stream(client: httpx.AsyncClient, mode: Mode) -> AsyncIterator[str]:
+    """
+    Server-Sent Events announcing each new forecast run for a mode: one
+    `forecast` event with the current version on connect, then one per run.
+    While Open-Meteo is unavailable and there is nothing to fall back on, an
+    `unavailable` event is sent instead and the stream stays open. The stream
+    ends when the app shuts down.
+    """
+    last_version = None
+    with forecast_events.subscribe() as queue:
+        while not forecast_events.closed:
+            try:
+                entry = await get_forecast(client, mode)
+            except UpstreamUnavailable as exc:
+                yield _sse("unavailable", {"mode": mode, "detail": str(exc), "retry_after": round(exc.retry_after, 1)})
+            else:
+                version = forecast_version(entry.fetched_at)
+                if version != last_version:
+                    last_version = version
+                    yield _sse("forecast", {"mode": mode, "version": version, "refreshed_at": isoformat_timestamp(entry.fetched_at)})
+            try:
+                event = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                return
+            if event["mode"] == mode and event["version"] != last_version:
+                last_version = event["version"]
+                yield _sse("forecast", event)
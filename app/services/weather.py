@@ -1,78 +1,211 @@
+import asyncio
+import math
+import time
 import httpx
-from datetime import date
-from typing import Literal
-from app.models.schemas import GridPoint, LocationWeather, HourlyPrecipitation
-from app.services.locations import get_all_locations
-
-Mode = Literal["callum", "robert"]
-
-# Bounding boxes for each mode
-BOUNDING_BOXES = {
-    # Callum mode: SE England (covers all hiking locations from E7 0AR)
-    "callum": {
-        "min_lat": 50.7,
-        "max_lat": 51.9,
-        "min_lon": -0.8,
-        "max_lon": 1.5,
-    },
-    # Robert mode: NW England (covers all hiking locations from WA12 9US)
-    "robert": {
-        "min_lat": 53.1,
-        "max_lat": 54.4,
-        "min_lon": -3.2,
-        "max_lon": -1.5,
-    },
-}
-
-# Grid size (8x8 = 64 points)
+import numpy as np
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from app import config
+from app.models.schemas import HourlyPrecipitation, WeatherResponse
+from app.services.cache import CacheEntry, ForecastCache
+from app.services.events import forecast_events
+from app.services.http_client import get_with_retries
+from app.services.locations import Mode, get_all_locations
+from app.services.metrics import observe_upstream_response, record_cache_lookup, record_upstream_event, timed
+from app.services.regions import get_region
+from app.services.resilience import UpstreamUnavailable, upstream_breaker
+from app.services.store import get_store
+
+# Grid size: about 8x8 points by default, up to about 64x64 on request (each
+# axis gets the point count its lattice allows nearest the one asked for),
+# and never more than MAX_GRID_POINTS points in all
 GRID_SIZE = 8
+MAX_GRID_SIZE = 64
+MAX_GRID_POINTS = MAX_GRID_SIZE * MAX_GRID_SIZE
+
+# Every grid of a region spans the region's box snapped outward to the
+# region step (GRID_LATTICE_DEGREES x 2^GRID_LEVELS, 0.2 degrees by default).
+# Finer grids halve that step down to the lattice unit; coarser ones use whole
+# multiples of it that divide the box. Either way the edges coincide and a
+# grid's points lie on every finer lattice-step grid of the region.
+GRID_LEVELS = 4
 
 # Walking hours (9am to 5pm)
 WALK_START_HOUR = 9
 WALK_END_HOUR = 17  # 5pm (exclusive, so 9-17 gives us 9am-4pm inclusive)
 
+# Forecast horizon: today plus the 14 days the date picker allows, fetched in
+# one upstream call so scrubbing through dates never goes back to Open-Meteo
+FORECAST_DAYS = 15
+HOURS_PER_DAY = 24
+
+# Forecast cache: Open-Meteo's UK models update roughly hourly, so a fetched
+# forecast is fresh for an hour and can be served stale for a few more hours
+# while a background refresh picks up the next model run.
+FORECAST_TTL_SECONDS = 60 * 60
+FORECAST_STALE_SECONDS = 3 * 60 * 60
+FORECAST_CACHE_SIZE = 64
+
+forecast_cache = ForecastCache(
+    ttl=FORECAST_TTL_SECONDS,
+    stale_ttl=FORECAST_STALE_SECONDS,
+    max_entries=FORECAST_CACHE_SIZE,
+    name="forecast",
+)
+
+# Per-coordinate hourly rows, shared between modes and resolutions so a point
+# fetched for one grid is not fetched again for another (grids are snapped to a
+# global lattice, so overlapping grids share coordinates). Enough for two
+# full-resolution grids and change.
+POINT_CACHE_SIZE = 2 * MAX_GRID_POINTS + 2048
+
+point_cache = ForecastCache(ttl=FORECAST_TTL_SECONDS, max_entries=POINT_CACHE_SIZE, name="point")
+
+# Limits concurrent upstream batch requests across the whole process
+_upstream_semaphore = asyncio.Semaphore(config.UPSTREAM_CONCURRENCY)
+
+
+# Rain classes used by the map colours (see getRainColor in map.js):
+# 0 = dry, 1 = light (<= 2mm), 2 = moderate (<= 5mm), 3 = heavy
+RAIN_THRESHOLDS_MM = np.array([0.0, 2.0, 5.0])
+
+
+class ForecastHorizon:
+    """Hourly precipitation for a set of points over consecutive days, as a points x hours float32 matrix."""
+
+    __slots__ = ("start_date", "days", "hourly")
+
+    def __init__(self, start_date: date, days: int, hourly: np.ndarray):
+        self.start_date = start_date
+        self.days = days
+        self.hourly = hourly
+
+    def day(self, target_date: date) -> np.ndarray:
+        """View of the points x 24 hourly values for `target_date`."""
+        start = (target_date - self.start_date).days * HOURS_PER_DAY
+        return self.hourly[:, start:start + HOURS_PER_DAY]
+
+
+def parse_hourly_matrix(hourly: list[list[Optional[float]]]) -> np.ndarray:
+    """Pack upstream hourly lists into a points x hours float32 matrix, treating missing values as dry."""
+    matrix = np.array(hourly, dtype=np.float32)  # None becomes NaN
+    if matrix.ndim != 2:
+        matrix = matrix.reshape(len(hourly), -1)
+    return np.nan_to_num(matrix, copy=False, nan=0.0)
+
+
+class GridSpec(NamedTuple):
+    """A regular lat/lon grid of rows x cols points spanning a bounding box, south-west corner first."""
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+    rows: int
+    cols: int
+
+    @property
+    def lat_step(self) -> float:
+        return (self.max_lat - self.min_lat) / (self.rows - 1)
+
+    @property
+    def lon_step(self) -> float:
+        return (self.max_lon - self.min_lon) / (self.cols - 1)
+
+    def points(self) -> list[tuple[float, float]]:
+        """Row-major (lat, lon) points, rounded so identical coordinates dedupe across grids."""
+        points = []
+        for i in range(self.rows):
+            # Interpolate rather than accumulate steps so nested grids land on identical points
+            lat = round(self.min_lat + (self.max_lat - self.min_lat) * i / (self.rows - 1), 4)
+            for j in range(self.cols):
+                lon = round(self.min_lon + (self.max_lon - self.min_lon) * j / (self.cols - 1), 4)
+                points.append((lat, lon))
+        return points
+
+
+def _snap_axis(low: float, high: float) -> tuple[float, float, list[int]]:
+    """
+    First and last coordinate of low..high snapped outward to the region
+    step, and the point counts a grid along it can have, smallest first.
+    """
+    region_step = config.GRID_LATTICE_DEGREES * 2 ** GRID_LEVELS
+    first = math.floor(low / region_step + 1e-9)
+    last = max(math.ceil(high / region_step - 1e-9), first + 1)
+    intervals = last - first
+    counts = [intervals // d + 1 for d in range(intervals, 1, -1) if intervals % d == 0]
+    counts += [intervals * 2 ** level + 1 for level in range(GRID_LEVELS + 1)]
+    return round(first * region_step, 4), round(last * region_step, 4), counts
+
+
+def _nearest_count(counts: list[int], size: int) -> int:
+    """Index of the count nearest `size` by ratio, preferring at least 3 points and the smaller on a tie."""
+    candidates = [i for i, count in enumerate(counts) if count >= 3] or [len(counts) - 1]
+    return min(candidates, key=lambda i: abs(math.log(counts[i] / size)))
+
+
+@lru_cache(maxsize=256)
+def grid_spec(mode: Mode = "callum", size: int = GRID_SIZE) -> GridSpec:
+    """
+    The grid of about size x size points (at most MAX_GRID_POINTS) covering
+    the region for the given mode, snapped to the global lattice. Overlapping
+    regions and different resolutions then land on the same coordinates and
+    share fetched points.
+    """
+    region = get_region(mode)
+    min_lat, max_lat, row_counts = _snap_axis(region.min_lat, region.max_lat)
+    min_lon, max_lon, col_counts = _snap_axis(region.min_lon, region.max_lon)
+    row, col = _nearest_count(row_counts, size), _nearest_count(col_counts, size)
+    # Coarsen the denser axis until the grid fits
+    while row_counts[row] * col_counts[col] > MAX_GRID_POINTS and (row or col):
+        if col == 0 or (row and row_counts[row] >= col_counts[col]):
+            row -= 1
+        else:
+            col -= 1
+    return GridSpec(min_lat, min_lon, max_lat, max_lon, row_counts[row], col_counts[col])
+
 
-def generate_grid_points(mode: Mode = "callum") -> list[tuple[float, float]]:
-    """Generate an 8x8 grid of lat/lon points covering the region for the given mode."""
-    bbox = BOUNDING_BOXES[mode]
-    points = []
-    lat_step = (bbox["max_lat"] - bbox["min_lat"]) / (GRID_SIZE - 1)
-    lon_step = (bbox["max_lon"] - bbox["min_lon"]) / (GRID_SIZE - 1)
+@lru_cache(maxsize=32)
+def _grid_points(spec: GridSpec) -> tuple[tuple[float, float], ...]:
+    return tuple(spec.points())
 
-    for i in range(GRID_SIZE):
-        for j in range(GRID_SIZE):
-            lat = bbox["min_lat"] + (i * lat_step)
-            lon = bbox["min_lon"] + (j * lon_step)
-            points.append((round(lat, 4), round(lon, 4)))
 
-    return points
+def generate_grid_points(mode: Mode = "callum", size: int = GRID_SIZE) -> list[tuple[float, float]]:
+    """Generate the lattice-snapped grid (about 8x8 by default) of lat/lon points covering the region for the given mode."""
+    return list(_grid_points(grid_spec(mode, size)))
 
 
 async def fetch_hourly_precipitation(
+    client: httpx.AsyncClient,
     latitudes: list[float],
     longitudes: list[float],
-    target_date: date
+    target_date: date,
+    end_date: Optional[date] = None
 ) -> list[list[float]]:
     """
     Fetch hourly precipitation from Open-Meteo API for multiple points.
-    Returns list of 24-hour precipitation arrays for each point.
+    Returns list of hourly precipitation arrays for each point, 24 values per
+    day from target_date to end_date inclusive (just target_date by default).
     """
+    if end_date is None:
+        end_date = target_date
+
     lat_str = ",".join(str(lat) for lat in latitudes)
     lon_str = ",".join(str(lon) for lon in longitudes)
 
-    url = "https://api.open-meteo.com/v1/forecast"
     params = {
         "latitude": lat_str,
         "longitude": lon_str,
         "hourly": "precipitation",
         "start_date": target_date.isoformat(),
-        "end_date": target_date.isoformat(),
+        "end_date": end_date.isoformat(),
         "timezone": "Europe/London"
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params, timeout=30.0)
-        response.raise_for_status()
+    with timed("upstream"):
+        response = await get_with_retries(client, config.OPEN_METEO_URL, params)
+    observe_upstream_response(len(latitudes), len(response.content))
+    with timed("decode"):
         data = response.json()
 
     # Handle single point vs multiple points response format
@@ -85,65 +218,346 @@ async def fetch_hourly_precipitation(
         return [data["hourly"]["precipitation"]]
 
 
-def sum_walking_hours(hourly_precip: list[float]) -> float:
-    """Sum precipitation during walking hours (9am-5pm)."""
-    return sum(hourly_precip[WALK_START_HOUR:WALK_END_HOUR + 1] or [0])
+def walking_hours(hourly_precip: np.ndarray) -> np.ndarray:
+    """Walking-hour (9am-5pm) columns of a day's hourly values, for one point or many, in mm to 2dp."""
+    return hourly_precip[..., WALK_START_HOUR:WALK_END_HOUR + 1].astype(np.float64).round(2)
+
+
+def sum_walking_hours(hourly_precip: np.ndarray) -> np.ndarray:
+    """Sum precipitation during walking hours (9am-5pm), for one point or many."""
+    return hourly_precip[..., WALK_START_HOUR:WALK_END_HOUR + 1].sum(axis=-1, dtype=np.float64).round(2)
 
 
-def extract_walking_hours(hourly_precip: list[float]) -> list[HourlyPrecipitation]:
-    """Extract precipitation for each walking hour (9am-5pm)."""
+def extract_walking_hours(hourly_precip: np.ndarray) -> list[HourlyPrecipitation]:
+    """Extract precipitation for each walking hour (9am-5pm) of a single point."""
+    return [HourlyPrecipitation(**hour) for hour in _hourly_breakdown(walking_hours(hourly_precip).tolist())]
+
+
+def _hourly_breakdown(walking_mm: list[float]) -> list[dict]:
     return [
-        HourlyPrecipitation(
-            hour=hour,
-            precipitation_mm=hourly_precip[hour] if hourly_precip[hour] else 0.0
-        )
-        for hour in range(WALK_START_HOUR, WALK_END_HOUR + 1)
+        {"hour": hour, "precipitation_mm": mm}
+        for hour, mm in zip(range(WALK_START_HOUR, WALK_END_HOUR + 1), walking_mm)
     ]
 
 
-async def get_weather_data(target_date: date, mode: Mode = "callum") -> tuple[list[GridPoint], list[LocationWeather]]:
+def classify_rain(precipitation_mm: np.ndarray) -> np.ndarray:
+    """Map precipitation totals to rain classes 0-3 (dry, light, moderate, heavy)."""
+    return np.searchsorted(RAIN_THRESHOLDS_MM, precipitation_mm, side="left").astype(np.uint8)
+
+
+def _forecast_points(mode: Mode, size: int = GRID_SIZE) -> tuple[tuple[tuple[float, float], ...], list]:
+    """Grid coordinates and locations for a mode, in the order they are fetched upstream."""
+    return _grid_points(grid_spec(mode, size)), get_all_locations(mode)
+
+
+def _forecast_key(mode: Mode, start_date: date, days: int, size: int = GRID_SIZE) -> tuple:
+    return (mode, start_date.isoformat(), days, grid_spec(mode, size))
+
+
+async def fetch_points(
+    client: httpx.AsyncClient,
+    coords: list[tuple[float, float]],
+    start_date: date,
+    days: int,
+    refresh: bool = False
+) -> CacheEntry:
     """
-    Get hourly precipitation data for the grid and all hiking locations.
+    Return a len(coords) x hours matrix of hourly precipitation for `coords`,
+    as a CacheEntry stamped with the fetch time of its oldest row.
+
+    Coordinates already fetched for another mode or resolution are reused from
+    the point cache, then from the persistent store shared with other workers
+    (neither is consulted when refresh=True). Duplicates are fetched once, and
+    the rest go upstream in batches of UPSTREAM_BATCH_SIZE, run concurrently
+    under a shared semaphore and reassembled in the original order. Each batch
+    is cached and stored as it arrives, so a failed fetch keeps the batches
+    that made it and a retry only asks for the rest. With the
+    store enabled, a file lock makes sure only one worker process fetches a
+    given horizon at a time.
     """
-    # Generate grid points for the selected mode
-    grid_coords = generate_grid_points(mode)
-    grid_lats = [p[0] for p in grid_coords]
-    grid_lons = [p[1] for p in grid_coords]
+    rows: dict[tuple[float, float], np.ndarray] = {}
+    fetched_at: dict[tuple[float, float], float] = {}
+    missing = []
+    for coord in dict.fromkeys(coords):
+        entry = None if refresh else point_cache.peek((coord, start_date, days))
+        if entry is not None and entry.age < point_cache.ttl:
+            rows[coord] = entry.value
+            fetched_at[coord] = entry.fetched_at
+        else:
+            missing.append(coord)
+    record_cache_lookup("point", "hit", len(rows))
 
-    # Get location coordinates for the selected mode
-    locations = get_all_locations(mode)
-    loc_lats = [loc.latitude for loc in locations]
-    loc_lons = [loc.longitude for loc in locations]
+    async def load_stored(wanted: list[tuple[float, float]]) -> list[tuple[float, float]]:
+        """Fill rows from the shared store; returns the coordinates still missing."""
+        with timed("store-load"):
+            stored = await asyncio.to_thread(store.load, wanted, start_date, days, point_cache.ttl)
+        record_cache_lookup("point", "store", len(stored))
+        for coord, (row, run_time) in stored.items():
+            rows[coord] = row
+            fetched_at[coord] = run_time
+            point_cache.put((coord, start_date, days), row, fetched_at=run_time)
+        return [coord for coord in wanted if coord not in stored]
 
-    # Combine all coordinates for a single API call
-    all_lats = grid_lats + loc_lats
-    all_lons = grid_lons + loc_lons
+    end_date = start_date + timedelta(days=days - 1)
 
-    # Fetch hourly precipitation for all points
-    all_hourly = await fetch_hourly_precipitation(all_lats, all_lons, target_date)
+    async def fetch_batch(batch: list[tuple[float, float]]) -> None:
+        """Fetch one batch and cache and store it straight away, so it survives a sibling failing."""
+        async with _upstream_semaphore:
+            hourly = await fetch_hourly_precipitation(
+                client, [c[0] for c in batch], [c[1] for c in batch], start_date, end_date
+            )
+        now = time.time()
+        with timed("parse"):
+            matrix = parse_hourly_matrix(hourly)
+        fetched = dict(zip(batch, matrix))
+        for coord, row in fetched.items():
+            rows[coord] = row
+            fetched_at[coord] = now
+            point_cache.put((coord, start_date, days), row, fetched_at=now)
+        if store is not None:
+            with timed("store-save"):
+                await asyncio.to_thread(store.save, fetched, start_date, days, now)
 
-    # Split results
-    grid_hourly = all_hourly[:len(grid_coords)]
-    loc_hourly = all_hourly[len(grid_coords):]
+    async def fetch_upstream(wanted: list[tuple[float, float]]) -> None:
+        batch_size = config.UPSTREAM_BATCH_SIZE
+        tasks = [
+            asyncio.ensure_future(fetch_batch(wanted[i:i + batch_size]))
+            for i in range(0, len(wanted), batch_size)
+        ]
+        record_cache_lookup("point", "miss", len(wanted))
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # One batch failing fails the fetch: stop the rest going upstream for nothing
+            for task in tasks:
+                task.cancel()
+            raise
 
-    # Build grid points response (total precipitation during walking hours)
-    grid_points = [
-        GridPoint(
-            latitude=grid_coords[i][0],
-            longitude=grid_coords[i][1],
-            precipitation_mm=sum_walking_hours(grid_hourly[i])
-        )
-        for i in range(len(grid_coords))
-    ]
+    store = get_store()
+    if missing and store is None:
+        await fetch_upstream(missing)
+    elif missing:
+        if not refresh:
+            missing = await load_stored(missing)
+        if missing and days == 1:
+            # Single days are looked up for arbitrary dates; coordinating them
+            # isn't worth a lock file per date
+            await fetch_upstream(missing)
+        elif missing:
+            # One worker process fetches a view's points at a time; the others
+            # wait here and then find its rows in the store instead of going upstream
+            async with store.fetch_lock(start_date, days, coords):
+                if not refresh:
+                    missing = await load_stored(missing)
+                await fetch_upstream(missing)
 
-    # Build location weather response with hourly breakdown
-    location_weather = [
-        LocationWeather(
-            location_id=locations[i].id,
-            hourly=extract_walking_hours(loc_hourly[i]),
-            total_mm=sum_walking_hours(loc_hourly[i])
-        )
-        for i in range(len(locations))
-    ]
+    if not coords:
+        return CacheEntry(np.zeros((0, days * HOURS_PER_DAY), dtype=np.float32), time.time())
+    return CacheEntry(np.stack([rows[coord] for coord in coords]), min(fetched_at.values()))
+
+
+async def get_forecast(
+    client: httpx.AsyncClient,
+    mode: Mode = "callum",
+    target_date: Optional[date] = None,
+    size: int = GRID_SIZE,
+    refresh: bool = False
+) -> CacheEntry:
+    """
+    Return the cached ForecastHorizon entry covering target_date (today by default)
+    for the mode's size x size grid points followed by its locations.
+
+    One upstream call is shared between every request for the same (mode, horizon,
+    grid spec). Dates inside the forecast horizon come from a single multi-day
+    fetch; anything else (e.g. past dates) falls back to a one-day fetch.
+    Pass refresh=True to fetch again even if the cached entry is still fresh.
+
+    If Open-Meteo fails or takes longer than the request deadline, the
+    last known forecast is returned with stale=True; with nothing cached,
+    UpstreamUnavailable is raised. Refreshes always raise.
+    """
+    start_date = date.today()
+    days = FORECAST_DAYS
+    if target_date is not None and not 0 <= (target_date - start_date).days < days:
+        start_date, days = target_date, 1
+
+    grid_coords, locations = _forecast_points(mode, size)
+    coords = list(grid_coords) + [(loc.latitude, loc.longitude) for loc in locations]
+
+    cache_key = _forecast_key(mode, start_date, days, size)
+
+    async def fetch_horizon() -> CacheEntry:
+        points = await fetch_points(client, coords, start_date, days, refresh=refresh)
+        # Tell streaming clients when the default view picks up a new run
+        previous = forecast_cache.peek(cache_key)
+        if days == FORECAST_DAYS and size == GRID_SIZE and (previous is None or previous.fetched_at != points.fetched_at):
+            forecast_events.publish({
+                "mode": mode,
+                "version": forecast_version(points.fetched_at),
+                "refreshed_at": isoformat_timestamp(points.fetched_at),
+            })
+        return CacheEntry(ForecastHorizon(start_date, days, points.value), points.fetched_at)
+
+    if refresh:
+        return await forecast_cache.refresh(cache_key, fetch_horizon)
+    try:
+        # The fetch is shared and keeps going past the deadline, filling the cache for later requests
+        return await asyncio.wait_for(forecast_cache.get_or_fetch(cache_key, fetch_horizon), _request_deadline(len(coords)))
+    except (asyncio.TimeoutError, httpx.HTTPError, UpstreamUnavailable) as exc:
+        fallback = _last_known_forecast(mode, start_date, days, size, target_date or start_date)
+        if fallback is None:
+            if isinstance(exc, UpstreamUnavailable):
+                raise
+            reason = "did not answer in time" if isinstance(exc, asyncio.TimeoutError) else f"failed ({type(exc).__name__})"
+            raise UpstreamUnavailable(f"Open-Meteo {reason}", upstream_breaker.retry_after()) from exc
+        record_upstream_event("stale-fallback")
+        return fallback
+
+
+def _request_deadline(point_count: int) -> float:
+    """
+    How long a request waits for a fetch of point_count points: the deadline
+    for every round of UPSTREAM_CONCURRENCY batches a cold fetch needs, so a
+    large grid gets the time it takes rather than a 503 halfway through.
+    """
+    batches = math.ceil(point_count / config.UPSTREAM_BATCH_SIZE)
+    rounds = max(1, math.ceil(batches / config.UPSTREAM_CONCURRENCY))
+    return config.REQUEST_DEADLINE_SECONDS * rounds
+
+
+def _last_known_forecast(mode: Mode, start_date: date, days: int, size: int, target_date: date) -> Optional[CacheEntry]:
+    """
+    The newest cached horizon for this view, however old, flagged stale: the
+    expired entry itself or, just after midnight, yesterday's horizon (if it
+    reaches target_date).
+    """
+    entry = forecast_cache.peek(_forecast_key(mode, start_date, days, size))
+    if entry is None and days == FORECAST_DAYS and (target_date - start_date).days < days - 1:
+        entry = forecast_cache.peek(_forecast_key(mode, start_date - timedelta(days=1), days, size))
+    if entry is None:
+        return None
+    return CacheEntry(entry.value, entry.fetched_at, stale=True)
+
+
+async def get_location_forecast(
+    client: httpx.AsyncClient,
+    mode: Mode = "callum"
+) -> tuple[list, ForecastHorizon, float]:
+    """
+    The mode's locations, their rows of the cached forecast horizon (today
+    onwards, from the same fetch as the default grid) and when it was fetched.
+    """
+    grid_coords, locations = _forecast_points(mode)
+    entry = await get_forecast(client, mode)
+    horizon = entry.value
+    return locations, ForecastHorizon(horizon.start_date, horizon.days, horizon.hourly[len(grid_coords):]), entry.fetched_at
 
-    return grid_points, location_weather
+
+def stored_forecast_time(mode: Mode) -> Optional[float]:
+    """
+    When the oldest point of today's default forecast for a mode was fetched,
+    according to the shared store; None without a store or with points
+    missing. Every worker sees the leader's pre-warmed forecast this way.
+    """
+    store = get_store()
+    if store is None:
+        return None
+    grid_coords, locations = _forecast_points(mode)
+    coords = list(dict.fromkeys([*grid_coords, *((loc.latitude, loc.longitude) for loc in locations)]))
+    return store.oldest_run(coords, date.today(), FORECAST_DAYS)
+
+
+def peek_forecast(mode: Mode = "callum", size: int = GRID_SIZE) -> Optional[CacheEntry]:
+    """Return today's cached forecast horizon for a mode without fetching, if there is one."""
+    return forecast_cache.peek(_forecast_key(mode, date.today(), FORECAST_DAYS, size))
+
+
+class WeatherSnapshot(NamedTuple):
+    """Walking-hour (9am-5pm) precipitation for one mode, date and grid, as arrays."""
+    date: date
+    grid: GridSpec
+    grid_coords: tuple[tuple[float, float], ...]
+    grid_totals: np.ndarray  # rows * cols, row-major from the south-west corner
+    location_ids: list[int]
+    hours: list[int]  # Walking hours labelling the columns of location_hours
+    location_hours: np.ndarray  # locations x walking hours
+    location_totals: np.ndarray
+    refreshed_at: float
+    stale: bool = False  # The last known forecast, served because Open-Meteo is unavailable
+
+
+async def get_weather_snapshot(
+    client: httpx.AsyncClient,
+    target_date: date,
+    mode: Mode = "callum",
+    size: int = GRID_SIZE
+) -> WeatherSnapshot:
+    """Slice the cached forecast for target_date and reduce it to walking-hour arrays."""
+    grid_coords, locations = _forecast_points(mode, size)
+    entry = await get_forecast(client, mode, target_date, size)
+    all_hourly = entry.value.day(target_date)
+
+    # Walking-hour slices and totals for every point at once
+    with timed("postprocess"):
+        totals = sum_walking_hours(all_hourly)
+        location_hours = walking_hours(all_hourly[len(grid_coords):])
+    return WeatherSnapshot(
+        date=target_date,
+        grid=grid_spec(mode, size),
+        grid_coords=grid_coords,
+        grid_totals=totals[:len(grid_coords)],
+        location_ids=[loc.id for loc in locations],
+        hours=list(range(WALK_START_HOUR, WALK_END_HOUR + 1)),
+        location_hours=location_hours,
+        location_totals=totals[len(grid_coords):],
+        refreshed_at=entry.fetched_at,
+        stale=entry.stale,
+    )
+
+
+def build_weather_response(snapshot: WeatherSnapshot) -> WeatherResponse:
+    """Expand a snapshot into the JSON-shaped WeatherResponse."""
+    # Build plain dicts and validate the whole response in one pass, which is
+    # much cheaper than constructing a model per grid point and hour
+    with timed("build"):
+        return WeatherResponse.model_validate({
+            "date": snapshot.date.isoformat(),
+            "grid": [
+                {"latitude": lat, "longitude": lon, "precipitation_mm": mm}
+                for (lat, lon), mm in zip(snapshot.grid_coords, snapshot.grid_totals.tolist())
+            ],
+            "locations": [
+                {"location_id": location_id, "hourly": _hourly_breakdown(values), "total_mm": total}
+                for location_id, values, total in zip(
+                    snapshot.location_ids, snapshot.location_hours.tolist(), snapshot.location_totals.tolist()
+                )
+            ],
+            "refreshed_at": isoformat_timestamp(snapshot.refreshed_at),
+            "version": forecast_version(snapshot.refreshed_at),
+            "stale": snapshot.stale,
+        })
+
+
+async def get_weather_data(
+    client: httpx.AsyncClient,
+    target_date: date,
+    mode: Mode = "callum",
+    size: int = GRID_SIZE
+) -> WeatherResponse:
+    """
+    Get hourly precipitation data for the size x size grid and all hiking locations.
+    """
+    return build_weather_response(await get_weather_snapshot(client, target_date, mode, size))
+
+
+def isoformat_timestamp(timestamp: float) -> str:
+    """Format a Unix timestamp as a UTC ISO 8601 string."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat(timespec="seconds")
+
+
+def forecast_version(fetched_at: float) -> str:
+    """
+    Opaque id for a forecast run: its fetch time in milliseconds. Rows in the
+    shared store keep their fetch time, so every worker agrees on it.
+    """
+    return str(int(fetched_at * 1000))
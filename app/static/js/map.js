@@ -12,8 +12,8 @@ const mapSettings = {
     robert: { center: [53.5, -2.4], zoom: 8, subtitle: '20 CIRCULAR WALKS // 2HR DRIVE FROM NEWTON-LE-WILLOWS' }
 };
 
-// Get settings for current mode
-const settings = mapSettings[currentMode] || mapSettings.callum;
+// Get settings for current mode; other regions are framed from /api/regions below
+const settings = mapSettings[currentMode] || { center: [54.0, -2.5], zoom: 6, subtitle: '' };
 
 // Update subtitle
 document.getElementById('subtitle-text').textContent = settings.subtitle;
@@ -21,15 +21,39 @@ document.getElementById('subtitle-text').textContent = settings.subtitle;
 // Initialize the map
 const map = L.map('map').setView(settings.center, settings.zoom);
 
+if (!mapSettings[currentMode]) {
+    fetch('/api/regions')
+        .then(response => response.json())
+        .then(data => {
+            const region = data.regions.find(r => r.id === currentMode);
+            if (!region) {
+                return;
+            }
+            const [minLat, minLon, maxLat, maxLon] = region.bbox;
+            map.fitBounds([[minLat, minLon], [maxLat, maxLon]]);
+            document.getElementById('subtitle-text').textContent =
+                region.location_count + ' CIRCULAR WALKS // ' + region.area.toUpperCase();
+        })
+        .catch(error => console.error('Error loading regions:', error));
+}
+
 // Add OpenStreetMap tiles
 L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
     maxZoom: 18,
     attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
 }).addTo(map);
 
-// Layer groups for markers and rain overlay
+// Rain overlay tiles are rendered server-side from the forecast grid; the
+// forecast version in the URL makes the browser fetch new tiles for a new run
+function rainTileUrl(date, version) {
+    return '/api/rain/{z}/{x}/{y}.png?date=' + date + '&mode=' + currentMode + (version ? '&v=' + version : '');
+}
+
+// Layer group for markers and tile layer for the rain overlay
 let locationMarkers = L.layerGroup().addTo(map);
-let rainOverlay = L.layerGroup().addTo(map);
+let rainOverlay = L.tileLayer(rainTileUrl(new Date().toISOString().split('T')[0]), {
+    maxZoom: 18
+}).addTo(map);
 
 // Store location data and weather data
 let locations = [];
@@ -170,42 +194,19 @@ function createPopupContent(location, locWeather) {
     `;
 }
 
-// Fetch and display weather data
-async function loadWeather(date) {
+// Fetch and display weather data. With revalidate the browser checks its
+// cached copy with the server (a cheap 304 if the forecast hasn't changed)
+async function loadWeather(date, revalidate = false) {
     showLoading(true);
 
     try {
         const url = '/api/weather?date=' + date + '&mode=' + currentMode;
         console.log('Fetching weather from:', url);
-        const response = await fetch(url);
+        const response = await fetch(url, revalidate ? { cache: 'no-cache' } : {});
         weatherData = await response.json();
 
-        // Clear existing rain overlay
-        rainOverlay.clearLayers();
-
-        // Add rain overlay circles for grid points with neon effect
-        weatherData.grid.forEach(point => {
-            const color = getRainColor(point.precipitation_mm);
-            // Outer glow
-            const glow = L.circleMarker([point.latitude, point.longitude], {
-                radius: 30,
-                fillColor: color,
-                fillOpacity: 0.15,
-                stroke: false
-            });
-            // Inner circle
-            const circle = L.circleMarker([point.latitude, point.longitude], {
-                radius: 20,
-                fillColor: color,
-                fillOpacity: 0.35,
-                stroke: true,
-                color: color,
-                weight: 1,
-                opacity: 0.5
-            });
-            rainOverlay.addLayer(glow);
-            rainOverlay.addLayer(circle);
-        });
+        // Point the server-rendered rain tiles at the selected date
+        rainOverlay.setUrl(rainTileUrl(date, weatherData.version));
 
         // Update location popups with weather data
         updateLocationPopups();
@@ -217,6 +218,58 @@ async function loadWeather(date) {
     }
 }
 
+// Fetch only what changed since the forecast version on screen and patch it
+// in; nothing is redrawn if the forecast hasn't changed
+async function refreshWeather(date) {
+    if (!weatherData.version || weatherData.date !== date) {
+        return loadWeather(date, true);
+    }
+
+    try {
+        const url = '/api/weather/delta?date=' + date + '&mode=' + currentMode + '&since=' + weatherData.version;
+        const response = await fetch(url, { cache: 'no-cache' });
+        const delta = await response.json();
+        if (delta.version === weatherData.version && !delta.full) {
+            return;
+        }
+
+        if (delta.full) {
+            weatherData.grid = delta.grid;
+            weatherData.locations = delta.locations;
+        } else {
+            const gridIndex = new Map(weatherData.grid.map((p, i) => [p.latitude + ',' + p.longitude, i]));
+            delta.grid.forEach(p => { weatherData.grid[gridIndex.get(p.latitude + ',' + p.longitude)] = p; });
+            const locationIndex = new Map(weatherData.locations.map((l, i) => [l.location_id, i]));
+            delta.locations.forEach(l => { weatherData.locations[locationIndex.get(l.location_id)] = l; });
+        }
+        weatherData.version = delta.version;
+        weatherData.refreshed_at = delta.refreshed_at;
+
+        if (delta.full || delta.grid.length) {
+            rainOverlay.setUrl(rainTileUrl(date, delta.version));
+        }
+        if (delta.full || delta.locations.length) {
+            updateLocationPopups();
+        }
+    } catch (error) {
+        console.error('Error refreshing weather:', error);
+    }
+}
+
+// Listen for new forecast runs pushed by the server instead of polling
+function subscribeToForecastUpdates() {
+    if (!window.EventSource) {
+        return;
+    }
+    const source = new EventSource('/api/weather/stream?mode=' + currentMode);
+    source.addEventListener('forecast', (e) => {
+        const update = JSON.parse(e.data);
+        if (weatherData.version && update.version !== weatherData.version) {
+            refreshWeather(document.getElementById('date-picker').value);
+        }
+    });
+}
+
 // Update location marker popups with weather data
 function updateLocationPopups() {
     locationMarkers.eachLayer(marker => {
@@ -258,7 +311,7 @@ function initDatePicker() {
 // Event listeners
 document.getElementById('refresh-btn').addEventListener('click', () => {
     const date = document.getElementById('date-picker').value;
-    loadWeather(date);
+    refreshWeather(date);
 });
 
 document.getElementById('date-picker').addEventListener('change', (e) => {
@@ -271,6 +324,7 @@ async function init() {
     await loadLocations();
     const today = new Date().toISOString().split('T')[0];
     await loadWeather(today);
+    subscribeToForecastUpdates();
 }
 
 // Start the app
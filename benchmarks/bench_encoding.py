@@ -0,0 +1,82 @@
+"""
+Compare payload size and client-side parse time of the JSON and compact
+/api/weather encodings at several grid resolutions.
+
+Run from the repo root:
+    python -m benchmarks.bench_encoding
+"""
+import gzip
+import json
+import time
+from datetime import date
+
+import numpy as np
+
+from app.models.schemas import CompactWeatherResponse, encode_compact_weather, unpack_values
+from app.services.compression import brotli
+from app.services.weather import build_weather_response, grid_spec, WeatherSnapshot
+
+RESOLUTIONS = [8, 32, 64]
+LOCATION_COUNT = 20
+REPEATS = 20
+
+
+def fake_snapshot(size: int) -> WeatherSnapshot:
+    rng = np.random.default_rng(42)
+    spec = grid_spec("callum", size)
+    points = spec.rows * spec.cols
+    totals = np.where(rng.random(points) < 0.4, rng.gamma(1.5, 2.0, points), 0.0).round(1)
+    hours = np.where(rng.random((LOCATION_COUNT, 9)) < 0.3, rng.gamma(1.0, 0.5, (LOCATION_COUNT, 9)), 0.0).round(1)
+    return WeatherSnapshot(
+        date=date.today(),
+        grid=spec,
+        grid_coords=tuple(spec.points()),
+        grid_totals=totals,
+        location_ids=list(range(1, LOCATION_COUNT + 1)),
+        hours=list(range(9, 18)),
+        location_hours=hours,
+        location_totals=hours.sum(axis=1).round(2),
+        refreshed_at=time.time(),
+    )
+
+
+def best_of(fn, *args) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def parse_json(body: bytes) -> list[float]:
+    return [point["precipitation_mm"] for point in json.loads(body)["grid"]]
+
+
+def parse_compact(body: bytes) -> np.ndarray:
+    return unpack_values(CompactWeatherResponse.model_validate_json(body).grid.precipitation_mm)
+
+
+def sizes(body: bytes) -> str:
+    gz = len(gzip.compress(body, 6))
+    br = len(brotli.compress(body, quality=5)) if brotli is not None else None
+    return f"{len(body):>9} {gz:>8} {br if br is not None else '-':>8}"
+
+
+def main() -> None:
+    print(f"{'grid':>9} {'format':>12} {'raw B':>9} {'gzip B':>8} {'br B':>8} {'parse ms':>9}")
+    for size in RESOLUTIONS:
+        snapshot = fake_snapshot(size)
+        payloads = {
+            "json": build_weather_response(snapshot).model_dump_json().encode(),
+            "compact-f32": encode_compact_weather(snapshot, "f32").model_dump_json().encode(),
+            "compact-u8": encode_compact_weather(snapshot, "u8").model_dump_json().encode(),
+        }
+        for name, body in payloads.items():
+            parser = parse_json if name == "json" else parse_compact
+            parse = best_of(parser, body)
+            print(f"{snapshot.grid.rows:>4}x{snapshot.grid.cols:<4} {name:>12} {sizes(body)} {parse * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Cold-start and per-request cost of the location catalogue as it grows: the
+built-in 40 hikes plus synthetic HIKING_LOCATIONS_FILE catalogues.
+
+Cold start is the wall time of `import app.main` in a fresh interpreter
+(the catalogue itself loads on first use, timed separately). Per-request
+cost is CPU time per /api/locations* request through the ASGI app.
+
+Run from the repo root:
+    python -m benchmarks.bench_locations [--sizes 0 10000 50000]
+
+Results are printed and written to benchmarks/results/ as JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from app import config
+from app.models.schemas import LocationsResponse
+from app.services.locations import CATALOGUE_FILE, LocationIndex, get_location_index, load_locations_geojson
+from app.services.regions import REGIONS
+from benchmarks.harness import REPO_ROOT, time_calls, write_results
+
+EXTRA_SIZES = [0, 10_000, 50_000]
+IMPORT_RUNS = 5
+REQUESTS = 200
+
+PATHS = {
+    "locations": "/api/locations?mode=callum",
+    "nearest": "/api/locations/nearest?lat=51.5&lon=0.0&n=10",
+    "within_25km": "/api/locations/within?lat=51.5&lon=0.0&radius_km=25&mode=callum",
+}
+
+
+def write_catalogue(path: Path, count: int) -> None:
+    """`count` synthetic hikes spread over the built-in regions, as GeoJSON."""
+    rng = np.random.default_rng(42)
+    regions = [REGIONS["callum"], REGIONS["robert"]]
+    features = []
+    for i in range(count):
+        region = regions[i % len(regions)]
+        lat = float(rng.uniform(region.min_lat, region.max_lat))
+        lon = float(rng.uniform(region.min_lon, region.max_lon))
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [round(lon, 4), round(lat, 4)]},
+            "properties": {
+                "id": 1000 + i,
+                "name": f"Trail {i}",
+                "type": "forest" if i % 3 else "coastal",
+                "description": "A synthetic hike for benchmarking the catalogue.",
+                "drive_time": "1hr",
+                "user": region.id,
+            },
+        })
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+
+def import_time_ms(locations_file: str) -> float:
+    """Median wall time of `import app.main` in a fresh interpreter."""
+    env = dict(os.environ, HIKING_LOCATIONS_FILE=locations_file)
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    runs = [
+        float(subprocess.run(
+            [sys.executable, "-c", code], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout) * 1000
+        for _ in range(IMPORT_RUNS)
+    ]
+    return round(statistics.median(runs), 2)
+
+
+def load_catalogue(locations_file: str) -> LocationIndex:
+    locations = load_locations_geojson(CATALOGUE_FILE, validate=False)
+    if locations_file:
+        locations.extend(load_locations_geojson(Path(locations_file)))
+    return LocationIndex(locations)
+
+
+async def request_cpu_ms(app, path: str) -> float:
+    """CPU milliseconds per request for `path`, after one warm-up request."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        (await client.get(path)).raise_for_status()
+        started = time.process_time()
+        for _ in range(REQUESTS):
+            await client.get(path)
+        return round((time.process_time() - started) / REQUESTS * 1000, 4)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=EXTRA_SIZES, help="Synthetic hikes to add")
+    args = parser.parse_args()
+
+    from app.main import app
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            locations_file = ""
+            if size:
+                locations_file = str(Path(tmp) / f"locations-{size}.geojson")
+                write_catalogue(Path(locations_file), size)
+
+            load = time_calls(load_catalogue, locations_file, repeats=3, number=1)
+            index = load_catalogue(locations_file)
+            pydantic_body = time_calls(
+                lambda: LocationsResponse(locations=[loc._asdict() for loc in index.by_mode["callum"]]).model_dump_json(),
+                repeats=3,
+                number=1,
+            )
+
+            # Serve this catalogue from the in-process app
+            config.LOCATIONS_FILE = locations_file
+            get_location_index.cache_clear()
+
+            row = {
+                "locations": len(index.by_id),
+                "import_app_ms": import_time_ms(locations_file),
+                "first_load_ms": load["median_ms"],
+                "pydantic_body_ms": pydantic_body["median_ms"],
+            }
+            for name, path in PATHS.items():
+                row[f"{name}_cpu_ms"] = asyncio.run(request_cpu_ms(app, path))
+            results[str(len(index.by_id))] = row
+
+    columns = list(next(iter(results.values())))[1:]
+    print(f"{'locations':>10}" + "".join(f"{column:>20}" for column in columns))
+    for count, row in results.items():
+        print(f"{count:>10}" + "".join(f"{row[column]:>20}" for column in columns))
+    print(f"Results written to {write_results('bench_locations', results, {'sizes': args.sizes, 'requests': REQUESTS})}")
+
+
+if __name__ == "__main__":
+    main()
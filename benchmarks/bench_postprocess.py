@@ -0,0 +1,106 @@
+"""
+Compare the original list-based weather post-processing with the vectorized
+NumPy pipeline in app/services/weather.py.
+
+Run from the repo root:
+    python -m benchmarks.bench_postprocess
+"""
+import random
+import time
+from datetime import date
+
+from app.models.schemas import GridPoint, HourlyPrecipitation, LocationWeather, WeatherResponse
+from app.services.weather import (
+    WALK_END_HOUR,
+    WALK_START_HOUR,
+    _hourly_breakdown,
+    parse_hourly_matrix,
+    sum_walking_hours,
+    walking_hours,
+)
+
+GRID_SIZES = [8, 32, 128]
+LOCATION_COUNT = 20
+FORECAST_DAYS = 15
+REPEATS = 5
+
+
+def fake_hourly(points: int, hours: int) -> list[list]:
+    """Upstream-shaped hourly lists: mostly dry, some showers, the odd missing value."""
+    rng = random.Random(42)
+    return [
+        [None if rng.random() < 0.01 else (round(rng.expovariate(2), 1) if rng.random() < 0.3 else 0.0) for _ in range(hours)]
+        for _ in range(points)
+    ]
+
+
+def legacy_path(hourly: list[list], grid_count: int, day: int) -> WeatherResponse:
+    """The original per-point list comprehensions and per-value Pydantic models."""
+    day_hourly = [values[day * 24:(day + 1) * 24] for values in hourly]
+
+    def legacy_sum(values):
+        return sum((v or 0.0) for v in values[WALK_START_HOUR:WALK_END_HOUR + 1])
+
+    def legacy_extract(values):
+        return [
+            HourlyPrecipitation(hour=hour, precipitation_mm=values[hour] if values[hour] else 0.0)
+            for hour in range(WALK_START_HOUR, WALK_END_HOUR + 1)
+        ]
+
+    grid = [
+        GridPoint(latitude=float(i), longitude=float(i), precipitation_mm=legacy_sum(day_hourly[i]))
+        for i in range(grid_count)
+    ]
+    locations = [
+        LocationWeather(location_id=i, hourly=legacy_extract(values), total_mm=legacy_sum(values))
+        for i, values in enumerate(day_hourly[grid_count:])
+    ]
+    return WeatherResponse(date=date.today().isoformat(), grid=grid, locations=locations)
+
+
+def vectorized_path(matrix, grid_count: int, day: int) -> WeatherResponse:
+    """Slice, sum and clean the pre-parsed float32 matrix with array operations."""
+    day_matrix = matrix[:, day * 24:(day + 1) * 24]
+    totals = sum_walking_hours(day_matrix).tolist()
+    loc_hours = walking_hours(day_matrix[grid_count:]).tolist()
+    return WeatherResponse.model_validate({
+        "date": date.today().isoformat(),
+        "grid": [
+            {"latitude": float(i), "longitude": float(i), "precipitation_mm": mm}
+            for i, mm in enumerate(totals[:grid_count])
+        ],
+        "locations": [
+            {"location_id": i, "hourly": _hourly_breakdown(values), "total_mm": total}
+            for i, (values, total) in enumerate(zip(loc_hours, totals[grid_count:]))
+        ],
+    })
+
+
+def best_of(fn, *args) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    # Parsing happens once per upstream fetch; the per-request columns are
+    # what every /api/weather call pays afterwards.
+    print(f"{'grid':>9} {'points':>7} {'parse ms':>9} {'legacy ms':>10} {'numpy ms':>9} {'speedup':>8}")
+    for size in GRID_SIZES:
+        grid_count = size * size
+        hourly = fake_hourly(grid_count + LOCATION_COUNT, FORECAST_DAYS * 24)
+        parse = best_of(parse_hourly_matrix, hourly)
+        matrix = parse_hourly_matrix(hourly)
+        legacy = best_of(legacy_path, hourly, grid_count, 3)
+        vectorized = best_of(vectorized_path, matrix, grid_count, 3)
+        print(
+            f"{size:>4}x{size:<4} {grid_count + LOCATION_COUNT:>7} {parse * 1000:>9.2f} "
+            f"{legacy * 1000:>10.2f} {vectorized * 1000:>9.2f} {legacy / vectorized:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+How the app behaves when Open-Meteo is slow or down, against the fault-
+injecting fake upstream.
+
+  tail    Upstream requests with a slow 5% tail, with and without hedging:
+          latency percentiles and how many extra requests hedging cost.
+  outage  The app under a full outage, a hung upstream and recovery: each
+          request's status and latency, and the circuit breaker state.
+
+Run from the repo root:
+    python -m benchmarks.bench_resilience [--scenarios tail outage]
+
+Results are printed and written to benchmarks/results/ as JSON.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from app import config
+from app.services import http_client, resilience
+from app.services.http_client import create_http_client, get_with_retries
+from benchmarks.harness import app_server, fake_upstream, percentiles, upstream_stats, write_results
+
+FAKE_PORT = 8099
+APP_PORT = 8100
+SCENARIOS = ["tail", "outage"]
+
+TAIL_REQUESTS = 400
+TAIL_CONCURRENCY = 8
+TAIL_FAULTS = {"latency_ms": 20, "slow_rate": 0.05, "slow_ms": 1500}
+
+# Short intervals so the outage scenario runs in seconds
+OUTAGE_ENV = {
+    "HIKING_REQUEST_DEADLINE_SECONDS": "2",
+    "HIKING_UPSTREAM_BUDGET_SECONDS": "4",
+    "HIKING_UPSTREAM_BACKOFF_SECONDS": "0.1",
+    "HIKING_UPSTREAM_BREAKER_FAILURES": "3",
+    "HIKING_UPSTREAM_BREAKER_RESET_SECONDS": "3",
+}
+
+
+async def set_faults(client: httpx.AsyncClient, upstream_url: str, **faults) -> None:
+    (await client.post(f"{upstream_url}/faults", json=faults)).raise_for_status()
+
+
+async def upstream_latencies(upstream_url: str, hedge: bool) -> dict:
+    """Latency of single-point upstream fetches made directly through get_with_retries."""
+    config.UPSTREAM_HEDGE = hedge
+    http_client.upstream_latency = resilience.LatencyWindow()
+    await upstream_stats(upstream_url, reset=True)
+    params = {"latitude": "51.5", "longitude": "0.0", "start_date": "2026-01-01", "end_date": "2026-01-01"}
+    latencies: list[float] = []
+    queue = list(range(TAIL_REQUESTS))
+
+    async with create_http_client() as client:
+        async def worker() -> None:
+            while queue:
+                queue.pop()
+                started = time.perf_counter()
+                await get_with_retries(client, f"{upstream_url}/v1/forecast", params)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(worker() for _ in range(TAIL_CONCURRENCY)))
+
+    # The first LATENCY_MIN_SAMPLES requests only fill the window hedging needs
+    return {
+        "latency": percentiles(latencies[resilience.LATENCY_MIN_SAMPLES:]),
+        "upstream_requests": (await upstream_stats(upstream_url))["requests"],
+    }
+
+
+async def run_tail() -> dict:
+    results = {}
+    async with fake_upstream(FAKE_PORT) as upstream_url:
+        async with httpx.AsyncClient() as client:
+            await set_faults(client, upstream_url, **TAIL_FAULTS)
+        for hedge in (False, True):
+            results["hedged" if hedge else "plain"] = await upstream_latencies(upstream_url, hedge)
+
+    print(f"{'tail':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'upstream':>9}")
+    for name, result in results.items():
+        latency = result["latency"]
+        print(
+            f"{name:>8} {latency['p50_ms']:>8.1f} {latency['p95_ms']:>8.1f} {latency['p99_ms']:>8.1f} "
+            f"{latency['max_ms']:>8.1f} {result['upstream_requests']:>9}"
+        )
+    return results
+
+
+async def run_outage() -> list[dict]:
+    """A sequence of phases; each request's status, latency, stale flag and the circuit state after it."""
+    timeline = []
+
+    async def request(client: httpx.AsyncClient, phase: str, path: str) -> None:
+        started = time.perf_counter()
+        response = await client.get(path)
+        health = (await client.get("/api/health")).json()
+        body = response.json() if response.headers.get("content-type") == "application/json" else {}
+        timeline.append({
+            "phase": phase,
+            "path": path,
+            "status": response.status_code,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+            "stale": body.get("stale"),
+            "circuit": health["upstream_circuit"],
+        })
+
+    async with fake_upstream(FAKE_PORT) as upstream_url:
+        with tempfile.TemporaryDirectory() as tmp:
+            store_path = os.path.join(tmp, "forecasts.sqlite3")
+            async with app_server(APP_PORT, upstream_url, store_path, env=OUTAGE_ENV) as base_url:
+                async with httpx.AsyncClient(base_url=base_url, timeout=60) as client, httpx.AsyncClient() as control:
+                    await request(client, "healthy", "/api/weather?mode=callum")
+
+                    await set_faults(control, upstream_url, error_rate=1.0)
+                    await request(client, "errors (cached)", "/api/weather?mode=callum")
+                    # Robert's region shares no grid points with callum's, so nothing of it is cached
+                    for resolution in range(8, 13):
+                        await request(client, "errors (uncached)", f"/api/weather?mode=robert&resolution={resolution}")
+
+                    await set_faults(control, upstream_url, error_rate=0.0, latency_ms=60_000)
+                    await asyncio.sleep(float(OUTAGE_ENV["HIKING_UPSTREAM_BREAKER_RESET_SECONDS"]))
+                    for resolution in range(13, 16):
+                        await request(client, "hung (uncached)", f"/api/weather?mode=robert&resolution={resolution}")
+
+                    await set_faults(control, upstream_url, latency_ms=0)
+                    await asyncio.sleep(float(OUTAGE_ENV["HIKING_UPSTREAM_BREAKER_RESET_SECONDS"]))
+                    for resolution in range(16, 19):
+                        await request(client, "recovered", f"/api/weather?mode=robert&resolution={resolution}")
+
+    print(f"{'phase':>18} {'path':<44} {'status':>6} {'ms':>8} {'stale':>6} {'circuit':>9}")
+    for row in timeline:
+        print(
+            f"{row['phase']:>18} {row['path']:<44} {row['status']:>6} {row['ms']:>8.1f} "
+            f"{str(row['stale']):>6} {row['circuit']:>9}"
+        )
+    return timeline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    args = parser.parse_args()
+
+    results = {}
+    if "tail" in args.scenarios:
+        results["tail"] = asyncio.run(run_tail())
+    if "outage" in args.scenarios:
+        results["outage"] = asyncio.run(run_outage())
+    settings = {"tail_faults": TAIL_FAULTS, "outage_env": OUTAGE_ENV, **vars(args)}
+    print(f"Results written to {write_results('bench_resilience', results, settings)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Microbenchmarks for the per-request weather code paths: grid generation,
+walking-hour sums and breakdowns, and response serialization.
+
+Run from the repo root:
+    python -m benchmarks.bench_weather
+
+Results are printed and written to benchmarks/results/ as JSON.
+"""
+import numpy as np
+
+from app.models.schemas import encode_compact_weather
+from app.services.weather import (
+    FORECAST_DAYS,
+    HOURS_PER_DAY,
+    _grid_points,
+    build_weather_response,
+    extract_walking_hours,
+    generate_grid_points,
+    grid_spec,
+    sum_walking_hours,
+)
+from benchmarks.bench_encoding import LOCATION_COUNT, fake_snapshot
+from benchmarks.harness import time_calls, write_results
+
+RESOLUTIONS = [8, 32, 64]
+
+
+def fake_matrix(points: int) -> np.ndarray:
+    """A points x horizon-hours float32 matrix shaped like a parsed upstream fetch."""
+    rng = np.random.default_rng(42)
+    hours = FORECAST_DAYS * HOURS_PER_DAY
+    return np.where(rng.random((points, hours)) < 0.3, rng.gamma(1.0, 0.5, (points, hours)), 0.0).astype(np.float32)
+
+
+def cold_grid_points(size: int) -> list:
+    _grid_points.cache_clear()
+    return generate_grid_points("callum", size)
+
+
+def extract_all(day: np.ndarray) -> list:
+    return [extract_walking_hours(row) for row in day]
+
+
+def main() -> None:
+    results = {}
+    for size in RESOLUTIONS:
+        spec = grid_spec("callum", size)
+        points = spec.rows * spec.cols + LOCATION_COUNT
+        day = fake_matrix(points)[:, 3 * HOURS_PER_DAY:4 * HOURS_PER_DAY]
+        snapshot = fake_snapshot(size)
+        results[f"{spec.rows}x{spec.cols}"] = {
+            "generate_grid_points_cold": time_calls(cold_grid_points, size),
+            "generate_grid_points_warm": time_calls(generate_grid_points, "callum", size),
+            "sum_walking_hours": time_calls(sum_walking_hours, day),
+            "extract_walking_hours_locations": time_calls(extract_all, day[-LOCATION_COUNT:]),
+            "serialize_json": time_calls(lambda: build_weather_response(snapshot).model_dump_json()),
+            "serialize_compact_f32": time_calls(lambda: encode_compact_weather(snapshot, "f32").model_dump_json()),
+            "serialize_compact_u8": time_calls(lambda: encode_compact_weather(snapshot, "u8").model_dump_json()),
+        }
+
+    names = list(next(iter(results.values())))
+    print(f"{'benchmark (ms/call, best round)':<34}" + "".join(f"{grid:>12}" for grid in results))
+    for name in names:
+        print(f"{name:<34}" + "".join(f"{results[grid][name]['min_ms']:>12.4f}" for grid in results))
+    print(f"Results written to {write_results('bench_weather', results, {'resolutions': RESOLUTIONS})}")
+
+
+if __name__ == "__main__":
+    main()
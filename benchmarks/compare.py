@@ -0,0 +1,46 @@
+"""
+Compare two benchmark result files written to benchmarks/results/.
+
+    python -m benchmarks.compare benchmarks/results/bench_weather-A.json benchmarks/results/bench_weather-B.json
+
+Prints every numeric result that appears in both runs with the relative
+change from the first to the second.
+"""
+import argparse
+import json
+from pathlib import Path
+
+# Run bookkeeping rather than measurements
+SKIPPED_KEYS = {"calls_per_round", "count", "seconds"}
+
+
+def flatten(data, prefix: str = "") -> dict[str, float]:
+    if isinstance(data, dict):
+        out = {}
+        for key, value in data.items():
+            out.update(flatten(value, f"{prefix}.{key}" if prefix else key))
+        return out
+    if isinstance(data, (int, float)) and not isinstance(data, bool):
+        return {prefix: float(data)}
+    return {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before", type=Path)
+    parser.add_argument("after", type=Path)
+    args = parser.parse_args()
+
+    before, after = (json.loads(path.read_text()) for path in (args.before, args.after))
+    print(f"{before['benchmark']}: {before.get('git_commit')} ({before['timestamp']}) -> {after.get('git_commit')} ({after['timestamp']})")
+    old, new = flatten(before["results"]), flatten(after["results"])
+    width = max((len(key) for key in old), default=10)
+    for key, value in old.items():
+        if key not in new or key.rsplit(".", 1)[-1] in SKIPPED_KEYS:
+            continue
+        change = f"{(new[key] - value) / value * 100:+8.1f}%" if value else "       -"
+        print(f"{key:<{width}} {value:>12.4f} {new[key]:>12.4f} {change}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+A local stand-in for the Open-Meteo forecast API, for load tests and benchmarks.
+
+It answers /v1/forecast with deterministic hourly precipitation for any
+number of points and counts the requests and points it has served. Latency,
+a rate of injected 503 errors and a rate of very slow responses can be set to
+exercise retries, hedging and the circuit breaker, at start-up or while it
+runs (POST /faults with any of latency_ms, error_rate, slow_rate, slow_ms).
+
+    python -m benchmarks.fake_open_meteo --port 8099 --latency-ms 300 --error-rate 0.05
+
+Point the app at it with HIKING_OPEN_METEO_URL=http://127.0.0.1:8099/v1/forecast
+"""
+import argparse
+import asyncio
+import random
+import zlib
+from datetime import date
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+app = FastAPI(title="Fake Open-Meteo")
+app.state.faults = {"latency_ms": 0.0, "error_rate": 0.0, "slow_rate": 0.0, "slow_ms": 0.0}
+app.state.stats = {"requests": 0, "points": 0, "errors": 0}
+
+
+class Faults(BaseModel):
+    latency_ms: Optional[float] = None  # Added to every forecast response
+    error_rate: Optional[float] = None  # Fraction answered with 503
+    slow_rate: Optional[float] = None  # Fraction delayed by slow_ms on top (a latency tail)
+    slow_ms: Optional[float] = None
+
+
+def hourly_precipitation(lat: float, lon: float, hours: int) -> list[float]:
+    """Deterministic, mostly dry hourly rain for a coordinate."""
+    rng = random.Random(zlib.crc32(f"{lat:.4f},{lon:.4f}".encode()))
+    return [round(rng.expovariate(1.5), 1) if rng.random() < 0.25 else 0.0 for _ in range(hours)]
+
+
+@app.get("/v1/forecast")
+async def forecast(
+    latitude: str,
+    longitude: str,
+    start_date: date,
+    end_date: date,
+    hourly: str = Query(default="precipitation"),
+    timezone: str = Query(default="GMT")
+):
+    lats = [float(v) for v in latitude.split(",")]
+    lons = [float(v) for v in longitude.split(",")]
+    hours = ((end_date - start_date).days + 1) * 24
+
+    faults = app.state.faults
+    app.state.stats["requests"] += 1
+    delay_ms = faults["latency_ms"]
+    if faults["slow_rate"] and random.random() < faults["slow_rate"]:
+        delay_ms += faults["slow_ms"]
+    if delay_ms:
+        await asyncio.sleep(delay_ms / 1000)
+    if faults["error_rate"] and random.random() < faults["error_rate"]:
+        app.state.stats["errors"] += 1
+        return JSONResponse({"error": True, "reason": "Injected failure"}, status_code=503)
+    app.state.stats["points"] += len(lats)
+
+    points = [
+        {"latitude": lat, "longitude": lon, "hourly": {"precipitation": hourly_precipitation(lat, lon, hours)}}
+        for lat, lon in zip(lats, lons)
+    ]
+    # Like Open-Meteo: a bare object for one point, a list for several
+    return JSONResponse(points[0] if len(points) == 1 else points)
+
+
+@app.get("/stats")
+async def stats():
+    return app.state.stats
+
+
+@app.post("/faults")
+async def set_faults(faults: Faults):
+    app.state.faults.update(faults.model_dump(exclude_none=True))
+    return app.state.faults
+
+
+@app.post("/reset")
+async def reset():
+    app.state.stats = {"requests": 0, "points": 0, "errors": 0}
+    return app.state.stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every forecast response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of forecast requests answered with 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of forecast requests delayed by --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="Extra delay for the slow fraction")
+    args = parser.parse_args()
+
+    app.state.faults.update(
+        latency_ms=args.latency_ms, error_rate=args.error_rate, slow_rate=args.slow_rate, slow_ms=args.slow_ms
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
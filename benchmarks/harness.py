@@ -0,0 +1,188 @@
+"""
+Shared helpers for the benchmarks: timing statistics, JSON result files,
+and starting the fake Open-Meteo server and the app as subprocesses.
+"""
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+REPO_ROOT = RESULTS_DIR.parent.parent
+
+
+def percentiles(samples_ms: list[float]) -> dict:
+    """Summary of a list of latencies in milliseconds."""
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": at(0.50),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def time_calls(fn: Callable, *args, repeats: int = 7, number: Optional[int] = None) -> dict:
+    """
+    Time `fn(*args)` like timeit: each of `repeats` rounds makes `number`
+    calls (chosen so a round takes ~20 ms if not given). Returns per-call ms.
+    """
+    if number is None:
+        number = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(number):
+                fn(*args)
+            if time.perf_counter() - started >= 0.02 or number >= 100_000:
+                break
+            number *= 10
+    rounds = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn(*args)
+        rounds.append((time.perf_counter() - started) / number * 1000)
+    return {
+        "calls_per_round": number,
+        "min_ms": round(min(rounds), 5),
+        "median_ms": round(statistics.median(rounds), 5),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(name: str, results: dict, settings: Optional[dict] = None) -> Path:
+    """Write a benchmark run to benchmarks/results/<name>-<timestamp>.json and return the path."""
+    now = datetime.now(timezone.utc)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"{name}-{now.strftime('%Y%m%dT%H%M%SZ')}.json"
+    path.write_text(json.dumps({
+        "benchmark": name,
+        "timestamp": now.isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": settings or {},
+        "results": results,
+    }, indent=2) + "\n")
+    return path
+
+
+def start_process(args: list[str], env: Optional[dict] = None) -> subprocess.Popen:
+    """Run `python <args>` from the repo root with output discarded."""
+    return subprocess.Popen(
+        [sys.executable, *args],
+        cwd=REPO_ROOT,
+        env=dict(os.environ, **(env or {})),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def wait_ready(url: str, timeout: float = 30.0) -> None:
+    """Poll `url` until it answers at all."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+
+@asynccontextmanager
+async def fake_upstream(
+    port: int,
+    latency_ms: float = 0.0,
+    error_rate: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_ms: float = 0.0
+) -> AsyncIterator[str]:
+    """Run benchmarks.fake_open_meteo; yields its base URL."""
+    process = start_process([
+        "-m", "benchmarks.fake_open_meteo",
+        "--port", str(port),
+        "--latency-ms", str(latency_ms),
+        "--error-rate", str(error_rate),
+        "--slow-rate", str(slow_rate),
+        "--slow-ms", str(slow_ms),
+    ])
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_ready(f"{base_url}/stats")
+        yield base_url
+    finally:
+        stop_process(process)
+
+
+@asynccontextmanager
+async def app_server(
+    port: int,
+    upstream_url: str,
+    store_path: str,
+    workers: int = 1,
+    env: Optional[dict] = None
+) -> AsyncIterator[str]:
+    """
+    Run the app under uvicorn against `upstream_url` with pre-warming off
+    (plus any other HIKING_* settings in `env`); yields its base URL.
+    """
+    process = start_process(
+        ["-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env={
+            "HIKING_OPEN_METEO_URL": f"{upstream_url}/v1/forecast",
+            "HIKING_STORE_PATH": store_path,
+            "HIKING_PREWARM_ENABLED": "0",
+            **(env or {}),
+        },
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_ready(f"{base_url}/api/locations")
+        yield base_url
+    finally:
+        stop_process(process)
+
+
+async def upstream_stats(upstream_url: str, reset: bool = False) -> dict:
+    async with httpx.AsyncClient() as client:
+        response = await (client.post(f"{upstream_url}/reset") if reset else client.get(f"{upstream_url}/stats"))
+        return response.json()
@@ -0,0 +1,54 @@
+"""
+Load test for multi-worker deployments against the fake Open-Meteo server.
+
+Starts the fake upstream and `uvicorn app.main:app --workers N` for each N,
+hammers /api/weather across both modes and every forecast date, and reports
+throughput alongside how many upstream requests the fleet made. With the
+shared forecast store, upstream requests should stay flat as N grows.
+
+    python -m benchmarks.load_multiworker --workers 1 2 4 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+from benchmarks.harness import app_server, fake_upstream, upstream_stats, write_results
+from benchmarks.loadgen import run_load, weather_paths
+
+FAKE_PORT = 8099
+APP_PORT = 8100
+
+
+async def run(workers: list[int], seconds: float, concurrency: int, latency_ms: float) -> dict:
+    results = {}
+    async with fake_upstream(FAKE_PORT, latency_ms) as upstream_url:
+        print(f"{'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'failed':>6} {'upstream req':>12} {'upstream pts':>12}")
+        for n in workers:
+            with tempfile.TemporaryDirectory() as tmp:
+                await upstream_stats(upstream_url, reset=True)
+                async with app_server(APP_PORT, upstream_url, os.path.join(tmp, "forecasts.sqlite3"), workers=n) as base_url:
+                    load = await run_load(base_url, weather_paths(), seconds, concurrency)
+                upstream = await upstream_stats(upstream_url)
+            results[f"workers_{n}"] = {**load, "upstream": upstream}
+            print(
+                f"{n:>7} {load['requests_per_second']:>8.1f} {load['latency']['p50_ms']:>8.1f} "
+                f"{load['latency']['p99_ms']:>8.1f} {load['failed']:>6} {upstream['requests']:>12} {upstream['points']:>12}"
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Fake upstream latency")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.workers, args.seconds, args.concurrency, args.latency_ms))
+    print(f"Results written to {write_results('load_multiworker', results, vars(args))}")
+
+
+if __name__ == "__main__":
+    main()
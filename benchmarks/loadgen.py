@@ -0,0 +1,132 @@
+"""
+Async load generator for the API, reporting p50/p95/p99 latency and req/s
+per endpoint.
+
+By default it starts the fake Open-Meteo server and a single app worker
+against it, so runs are offline and repeatable:
+
+    python -m benchmarks.loadgen --seconds 10 --concurrency 32 --latency-ms 200
+
+Point it at an already running app with --url http://127.0.0.1:8000.
+Results are printed and written to benchmarks/results/ as JSON.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+import httpx
+
+from benchmarks.harness import app_server, fake_upstream, percentiles, upstream_stats, write_results
+
+FAKE_PORT = 8099
+APP_PORT = 8100
+ENDPOINTS = ["weather", "locations"]
+
+
+def weather_paths(resolution: Optional[int] = None) -> list[str]:
+    """/api/weather for both modes and every date in the forecast horizon."""
+    query = f"&resolution={resolution}" if resolution else ""
+    return [
+        f"/api/weather?mode={mode}&date={date.today() + timedelta(days=d)}{query}"
+        for mode in ("callum", "robert")
+        for d in range(15)
+    ]
+
+
+def locations_paths() -> list[str]:
+    return ["/api/locations?mode=callum", "/api/locations?mode=robert"]
+
+
+async def run_load(base_url: str, paths: list[str], seconds: float, concurrency: int) -> dict:
+    """
+    Keep `concurrency` requests in flight for `seconds`, cycling through
+    `paths`, and return latency percentiles and throughput.
+    """
+    latencies: list[float] = []
+    failed = 0
+    deadline = time.monotonic() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        async def worker(offset: int) -> None:
+            nonlocal failed
+            i = offset
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    failed += 1
+                i += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    return {
+        "ok": len(latencies),
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 2),
+        "latency": percentiles(latencies),
+    }
+
+
+async def run_endpoints(base_url: str, endpoints: list[str], seconds: float, concurrency: int, resolution: Optional[int]) -> dict:
+    paths = {"weather": weather_paths(resolution), "locations": locations_paths()}
+    results = {}
+    print(f"{'endpoint':>10} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'failed':>6}")
+    for name in endpoints:
+        # One pass first so the numbers measure steady state, not the cold fetch
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            for path in paths[name]:
+                await client.get(path)
+        result = await run_load(base_url, paths[name], seconds, concurrency)
+        results[name] = result
+        latency = result["latency"]
+        print(
+            f"{name:>10} {result['requests_per_second']:>9.1f} {latency.get('p50_ms', 0):>8.2f} "
+            f"{latency.get('p95_ms', 0):>8.2f} {latency.get('p99_ms', 0):>8.2f} {result['failed']:>6}"
+        )
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.url:
+        return await run_endpoints(args.url, args.endpoints, args.seconds, args.concurrency, args.resolution)
+
+    async with fake_upstream(FAKE_PORT, args.latency_ms, args.error_rate) as upstream_url:
+        with tempfile.TemporaryDirectory() as tmp:
+            async with app_server(APP_PORT, upstream_url, os.path.join(tmp, "forecasts.sqlite3"), args.workers) as base_url:
+                results = await run_endpoints(base_url, args.endpoints, args.seconds, args.concurrency, args.resolution)
+        results["upstream"] = await upstream_stats(upstream_url)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Load an already running app instead of starting one")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--resolution", type=int, help="Weather grid size (the app's default if not given)")
+    parser.add_argument("--workers", type=int, default=1, help="App worker processes")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fake upstream latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake upstream 503 rate")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"Results written to {write_results('loadgen', results, vars(args))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+
+# Tests run in-process against httpx.MockTransport: no shared store, no
+# background refresh. Set before anything imports app.config.
+os.environ["HIKING_STORE_PATH"] = ""
+os.environ["HIKING_PREWARM_ENABLED"] = "0"
+
+import pytest
+
+from app import config
+from app.services import http_client, resilience, weather
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def fresh_upstream_state(monkeypatch):
+    """A closed circuit, empty caches, no latency history and short backoffs for every test."""
+    resilience.upstream_breaker.record_success()
+    weather.forecast_cache.clear()
+    weather.point_cache.clear()
+    monkeypatch.setattr(http_client, "upstream_latency", resilience.LatencyWindow())
+    monkeypatch.setattr(config, "UPSTREAM_BACKOFF_SECONDS", 0.01)
+    monkeypatch.setattr(config, "UPSTREAM_HEDGE", False)
+    yield
+    resilience.upstream_breaker.record_success()
+    weather.forecast_cache.clear()
+    weather.point_cache.clear()
+
+
+class FakeClock:
+    """Stands in for the `time` module so circuit intervals pass instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(resilience, "time", fake)
+    return fake
@@ -0,0 +1,93 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.http_client import create_http_client
+from app.services.locations import get_location_index, haversine_km
+from app.services.weather import HOURS_PER_DAY
+
+
+def open_meteo(request: httpx.Request) -> httpx.Response:
+    """Dry weather for every requested point."""
+    params = request.url.params
+    hours = HOURS_PER_DAY * (15 if params["start_date"] != params["end_date"] else 1)
+    return httpx.Response(200, json=[
+        {"hourly": {"precipitation": [0.0] * hours}} for _ in params["latitude"].split(",")
+    ])
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        app.state.http_client = create_http_client(httpx.MockTransport(open_meteo))
+        yield test_client
+
+
+def test_delta_is_always_revalidated(client):
+    version = client.get("/api/weather?mode=callum").json()["version"]
+
+    response = client.get(f"/api/weather/delta?mode=callum&since={version}")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.json()["grid"] == []
+    revalidated = client.get(
+        f"/api/weather/delta?mode=callum&since={version}", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.parametrize("bbox", [
+    "nan,0,1,1",
+    "0,0,1,inf",
+    "0,-inf,1,1",
+    "1,0,0,1",
+    "0,1,1,0",
+    "-91,0,1,1",
+    "0,0,1,181",
+    "0,0,1",
+    "a,b,c,d",
+])
+def test_within_rejects_bad_bboxes(client, bbox):
+    response = client.get(f"/api/locations/within?bbox={bbox}")
+    assert response.status_code == 422
+
+
+def test_within_bbox_returns_hikes_inside_it(client):
+    response = client.get("/api/locations/within?bbox=50.7,-0.8,51.9,1.5&mode=callum")
+
+    assert response.status_code == 200
+    locations = response.json()["locations"]
+    assert locations
+    assert all(50.7 <= loc["latitude"] <= 51.9 and -0.8 <= loc["longitude"] <= 1.5 for loc in locations)
+    assert {loc["user"] for loc in locations} == {"callum"}
+
+
+def test_within_radius_is_sorted_and_bounded(client):
+    response = client.get("/api/locations/within?lat=51.5&lon=0.0&radius_km=40")
+
+    distances = [loc["distance_km"] for loc in response.json()["locations"]]
+    assert distances
+    assert distances == sorted(distances)
+    assert all(d <= 40 for d in distances)
+
+
+def test_within_needs_bbox_or_a_circle(client):
+    assert client.get("/api/locations/within?lat=51.5&lon=0.0").status_code == 422
+
+
+def test_nearest_matches_a_brute_force_search(client):
+    response = client.get("/api/locations/nearest?lat=53.5&lon=-2.5&n=5")
+
+    expected = sorted(
+        get_location_index().by_id.values(),
+        key=lambda loc: (haversine_km(53.5, -2.5, loc.latitude, loc.longitude), loc.id),
+    )[:5]
+    assert [loc["id"] for loc in response.json()["locations"]] == [loc.id for loc in expected]
+
+
+def test_nearest_filters_by_mode(client):
+    locations = client.get("/api/locations/nearest?lat=53.5&lon=-2.5&n=3&mode=callum").json()["locations"]
+    assert len(locations) == 3
+    assert {loc["user"] for loc in locations} == {"callum"}
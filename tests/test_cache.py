@@ -0,0 +1,176 @@
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+import pytest
+
+from app.services import weather
+from app.services.cache import CacheEntry, ForecastCache
+from app.services.http_client import create_http_client
+
+pytestmark = pytest.mark.anyio
+
+TTL = 60
+STALE = 120
+
+
+class Upstream:
+    """A fetch function that counts calls and can be made slow or failing."""
+
+    def __init__(self, delay: float = 0.0, error: Optional[Exception] = None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f"value {self.calls}"
+
+
+def aged(cache: ForecastCache, key, seconds: float, value="old") -> None:
+    cache.put(key, value, fetched_at=time.time() - seconds)
+
+
+async def test_miss_fetches_and_fresh_entry_is_a_hit():
+    cache = ForecastCache(ttl=TTL, stale_ttl=STALE)
+    fetch = Upstream()
+
+    first = await cache.get_or_fetch("k", fetch)
+    second = await cache.get_or_fetch("k", fetch)
+
+    assert first.value == second.value == "value 1"
+    assert fetch.calls == 1
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+
+
+async def test_expired_entry_past_the_stale_window_is_refetched():
+    cache = ForecastCache(ttl=TTL, stale_ttl=STALE)
+    aged(cache, "k", TTL + STALE + 1)
+    fetch = Upstream()
+
+    entry = await cache.get_or_fetch("k", fetch)
+
+    assert entry.value == "value 1"
+    assert fetch.calls == 1
+
+
+async def test_stale_entry_is_served_while_one_background_refresh_runs():
+    cache = ForecastCache(ttl=TTL, stale_ttl=STALE)
+    aged(cache, "k", TTL + 1)
+    fetch = Upstream(delay=0.05)
+
+    served = [await cache.get_or_fetch("k", fetch) for _ in range(3)]
+
+    assert [entry.value for entry in served] == ["old"] * 3
+    assert cache.stats()["stale_hits"] == 3 and cache.stats()["refreshes"] == 1
+    await asyncio.sleep(0.1)
+    assert fetch.calls == 1
+    assert (await cache.get_or_fetch("k", fetch)).value == "value 1"
+
+
+async def test_concurrent_misses_share_one_fetch():
+    cache = ForecastCache(ttl=TTL)
+    fetch = Upstream(delay=0.05)
+
+    entries = await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(10)))
+
+    assert fetch.calls == 1
+    assert {entry.value for entry in entries} == {"value 1"}
+    assert cache.stats()["coalesced"] == 9
+
+
+async def test_cancelled_waiter_does_not_cancel_the_shared_fetch():
+    cache = ForecastCache(ttl=TTL)
+    fetch = Upstream(delay=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(cache.get_or_fetch("k", fetch), 0.01)
+    entry = await cache.get_or_fetch("k", fetch)
+
+    assert entry.value == "value 1"
+    assert fetch.calls == 1
+
+
+async def test_fetch_errors_reach_every_waiter_and_are_not_cached():
+    cache = ForecastCache(ttl=TTL)
+    failing = Upstream(delay=0.01, error=RuntimeError("upstream down"))
+
+    results = await asyncio.gather(*(cache.get_or_fetch("k", failing) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert failing.calls == 1
+    assert cache.peek("k") is None
+    assert cache.stats()["errors"] == 1
+    assert (await cache.get_or_fetch("k", Upstream())).value == "value 1"
+
+
+async def test_failed_background_refresh_keeps_the_stale_entry():
+    cache = ForecastCache(ttl=TTL, stale_ttl=STALE)
+    aged(cache, "k", TTL + 1)
+
+    entry = await cache.get_or_fetch("k", Upstream(error=RuntimeError("upstream down")))
+    await asyncio.sleep(0.01)
+
+    assert entry.value == "old"
+    assert cache.peek("k").value == "old"
+
+
+async def test_least_recently_used_entry_is_evicted():
+    cache = ForecastCache(ttl=TTL, max_entries=2)
+    for key in ("a", "b"):
+        await cache.get_or_fetch(key, Upstream())
+    await cache.get_or_fetch("a", Upstream())  # a is now the most recent
+
+    await cache.get_or_fetch("c", Upstream())
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") is not None and cache.peek("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_fetch_may_say_how_old_its_data_is():
+    cache = ForecastCache(ttl=TTL)
+    fetched_at = time.time() - 30
+
+    async def stored():
+        return CacheEntry("from the store", fetched_at)
+
+    entry = await cache.get_or_fetch("k", stored)
+
+    assert entry.fetched_at == fetched_at
+    assert 30 <= entry.age < TTL
+
+
+async def test_refresh_fetches_a_fresh_entry_again():
+    cache = ForecastCache(ttl=TTL)
+    fetch = Upstream()
+    await cache.get_or_fetch("k", fetch)
+
+    entry = await cache.refresh("k", fetch)
+
+    assert entry.value == "value 2"
+    assert fetch.calls == 2
+
+
+async def test_concurrent_forecast_requests_make_one_set_of_upstream_calls():
+    requests = []
+
+    async def open_meteo(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        points = request.url.params["latitude"].split(",")
+        hours = weather.FORECAST_DAYS * weather.HOURS_PER_DAY
+        return httpx.Response(200, json=[{"hourly": {"precipitation": [0.0] * hours}} for _ in points])
+
+    async with create_http_client(httpx.MockTransport(open_meteo)) as client:
+        entries = await asyncio.gather(*(weather.get_forecast(client, "callum") for _ in range(5)))
+        cold_requests = len(requests)
+        await weather.get_forecast(client, "callum")
+
+    assert cold_requests >= 1
+    assert len(requests) == cold_requests
+    assert len({id(entry.value) for entry in entries}) == 1
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from app.models.schemas import U8_SCALE_MM, encode_compact_weather, pack_values, unpack_values
+from app.services.weather import MAX_GRID_SIZE, build_weather_response
+from benchmarks.bench_encoding import best_of, fake_snapshot, parse_compact, parse_json
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return fake_snapshot(MAX_GRID_SIZE)
+
+
+def test_f32_round_trips_exactly():
+    values = np.array([[0.0, 0.1, 2.5], [7.25, 40.0, 0.3]], dtype=np.float32)
+    assert np.array_equal(unpack_values(pack_values(values, "f32")), values)
+
+
+def test_u8_round_trips_within_one_quantization_step():
+    values = np.array([[0.0, 0.1, 2.5], [7.25, 40.0, 0.3]])
+    packed = pack_values(values, "u8")
+    step = max(U8_SCALE_MM, values.max() / 255)
+
+    assert packed.scale == pytest.approx(step)
+    assert unpack_values(packed).shape == values.shape
+    assert np.abs(unpack_values(packed) - values).max() <= step / 2 + 1e-9
+
+
+def test_u8_keeps_dry_points_dry():
+    values = np.zeros((2, 2))
+    assert not unpack_values(pack_values(values, "u8")).any()
+
+
+@pytest.mark.parametrize("encoding", ["f32", "u8"])
+def test_compact_body_matches_json_and_is_smaller(snapshot, encoding):
+    json_body = build_weather_response(snapshot).model_dump_json().encode()
+    compact_body = encode_compact_weather(snapshot, encoding).model_dump_json().encode()
+
+    grid = parse_compact(compact_body)
+    assert grid.shape == (snapshot.grid.rows, snapshot.grid.cols)
+    tolerance = 1e-6 if encoding == "f32" else grid.max() / 255 + U8_SCALE_MM
+    assert np.allclose(grid.ravel(), parse_json(json_body), atol=tolerance)
+    assert len(compact_body) < len(json_body) / 4
+
+
+def test_compact_body_parses_faster_than_json(snapshot):
+    json_body = build_weather_response(snapshot).model_dump_json().encode()
+    compact_body = encode_compact_weather(snapshot, "f32").model_dump_json().encode()
+
+    assert best_of(parse_compact, compact_body) < best_of(parse_json, json_body)
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from datetime import date, timedelta
+
+import httpx
+import numpy as np
+import pytest
+
+from app import config
+from app.services import weather
+from app.services.http_client import create_http_client
+from app.services.weather import HOURS_PER_DAY, fetch_points, point_cache
+
+pytestmark = pytest.mark.anyio
+
+START = date.today()
+DAYS = 2
+COORDS = [(50.0 + i / 10, 0.0) for i in range(6)]
+
+
+def forecast_body(request: httpx.Request) -> list[dict]:
+    """Open-Meteo's multi-point answer, with each point's latitude as its precipitation."""
+    params = request.url.params
+    hours = ((date.fromisoformat(params["end_date"]) - date.fromisoformat(params["start_date"])).days + 1) * HOURS_PER_DAY
+    return [{"hourly": {"precipitation": [float(lat)] * hours}} for lat in params["latitude"].split(",")]
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(config, "UPSTREAM_BATCH_SIZE", 2)
+    monkeypatch.setattr(config, "UPSTREAM_RETRIES", 0)
+
+
+async def test_batches_are_reassembled_in_order_and_deduplicated():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=forecast_body(request))
+
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        entry = await fetch_points(client, COORDS + COORDS[:2], START, DAYS)
+
+    assert len(requests) == 3
+    assert entry.value.shape == (8, DAYS * HOURS_PER_DAY)
+    assert entry.value[:, 0].tolist() == pytest.approx([lat for lat, _ in COORDS + COORDS[:2]])
+
+
+async def test_failed_batch_keeps_the_others_and_cancels_the_rest(monkeypatch):
+    monkeypatch.setattr(weather, "_upstream_semaphore", asyncio.Semaphore(3))
+    cancelled = []
+
+    async def handler(request):
+        first_lat = float(request.url.params["latitude"].split(",")[0])
+        if first_lat == COORDS[2][0]:
+            await asyncio.sleep(0.05)
+            return httpx.Response(400)
+        if first_lat == COORDS[4][0]:
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(first_lat)
+                raise
+        return httpx.Response(200, json=forecast_body(request))
+
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        started = time.monotonic()
+        with pytest.raises(httpx.HTTPStatusError):
+            await fetch_points(client, COORDS, START, DAYS)
+        await asyncio.sleep(0.01)
+
+    assert time.monotonic() - started < 0.5
+    assert cancelled == [COORDS[4][0]]
+    cached = [coord for coord in COORDS if point_cache.peek((coord, START, DAYS)) is not None]
+    assert cached == COORDS[:2]
+
+
+async def test_retry_only_fetches_what_is_missing():
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.params["latitude"])
+        return httpx.Response(200, json=forecast_body(request))
+
+    for coord in COORDS[:4]:
+        point_cache.put((coord, START, DAYS), np.zeros(DAYS * HOURS_PER_DAY, dtype=np.float32))
+
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        await fetch_points(client, COORDS, START, DAYS)
+
+    assert requests == [f"{COORDS[4][0]},{COORDS[5][0]}"]
+
+
+def test_request_deadline_grows_with_the_upstream_rounds_a_grid_needs():
+    per_round = config.UPSTREAM_BATCH_SIZE * config.UPSTREAM_CONCURRENCY
+    assert weather._request_deadline(1) == config.REQUEST_DEADLINE_SECONDS
+    assert weather._request_deadline(per_round) == config.REQUEST_DEADLINE_SECONDS
+    assert weather._request_deadline(per_round + 1) == 2 * config.REQUEST_DEADLINE_SECONDS
@@ -0,0 +1,31 @@
+import pytest
+
+from app.services.regions import REGIONS
+from app.services.weather import GRID_SIZE, MAX_GRID_POINTS, MAX_GRID_SIZE, grid_spec
+
+
+@pytest.mark.parametrize("mode", ["callum", "robert"])
+def test_resolutions_share_the_extent_and_nest(mode):
+    finest = grid_spec(mode, MAX_GRID_SIZE)
+    finest_points = set(finest.points())
+    for size in (3, GRID_SIZE, 16):
+        spec = grid_spec(mode, size)
+        assert spec[:4] == finest[:4]
+        assert set(spec.points()) <= finest_points
+
+
+@pytest.mark.parametrize("mode", ["callum", "robert"])
+def test_grid_covers_the_region(mode):
+    region = REGIONS[mode]
+    spec = grid_spec(mode)
+    assert spec.min_lat <= region.min_lat and spec.max_lat >= region.max_lat
+    assert spec.min_lon <= region.min_lon and spec.max_lon >= region.max_lon
+
+
+@pytest.mark.parametrize("mode", ["callum", "robert"])
+@pytest.mark.parametrize("size", [3, GRID_SIZE, 16, 32, MAX_GRID_SIZE])
+def test_sides_stay_near_the_resolution(mode, size):
+    spec = grid_spec(mode, size)
+    assert spec.rows * spec.cols <= MAX_GRID_POINTS
+    assert max(spec.rows, spec.cols) <= max(2 * size, 8)
+
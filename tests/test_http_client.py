@@ -0,0 +1,201 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app import config
+from app.services import http_client
+from app.services.http_client import create_http_client, get_with_retries
+from app.services.metrics import upstream_events
+from app.services.resilience import LATENCY_MIN_SAMPLES, UpstreamUnavailable, upstream_breaker
+
+pytestmark = pytest.mark.anyio
+
+URL = "https://open-meteo.test/v1/forecast"
+HEDGE_AFTER = 0.02
+
+
+def event_count(event: str) -> float:
+    return upstream_events._values.get((event,), 0)
+
+
+def scripted(*steps):
+    """
+    A MockTransport handler answering the n-th request with steps[n]: a
+    (delay seconds, status or exception) pair. Records calls and cancellations.
+    """
+    calls = []
+    cancelled = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        index = len(calls)
+        calls.append(request)
+        delay, outcome = steps[min(index, len(steps) - 1)]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, text=f"response {index}")
+
+    return handler, calls, cancelled
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    """Hedging on, with a latency history whose 95th percentile is HEDGE_AFTER."""
+    monkeypatch.setattr(config, "UPSTREAM_HEDGE", True)
+    for _ in range(LATENCY_MIN_SAMPLES):
+        http_client.upstream_latency.record(HEDGE_AFTER)
+
+
+async def test_retries_transient_errors_then_succeeds():
+    handler, calls, _ = scripted((0, 503), (0, 429), (0, 200))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        response = await get_with_retries(client, URL, {})
+
+    assert response.text == "response 2"
+    assert len(calls) == 3
+    assert upstream_breaker.state == "closed"
+
+
+async def test_gives_up_after_configured_retries(monkeypatch):
+    monkeypatch.setattr(config, "UPSTREAM_RETRIES", 2)
+    handler, calls, _ = scripted((0, 502))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await get_with_retries(client, URL, {})
+
+    assert len(calls) == 3
+
+
+async def test_hung_upstream_stays_within_budget():
+    async def hung(request: httpx.Request) -> httpx.Response:
+        # Time out the way the network transport would, after the per-attempt read timeout
+        await asyncio.sleep(request.extensions["timeout"]["read"])
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    async with create_http_client(httpx.MockTransport(hung)) as client:
+        started = time.monotonic()
+        with pytest.raises(httpx.TimeoutException):
+            await get_with_retries(client, URL, {}, budget=0.3)
+
+    assert time.monotonic() - started < 0.4
+
+
+async def test_attempt_is_cut_off_at_the_budget():
+    handler, calls, cancelled = scripted((5.0, 200))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        started = time.monotonic()
+        with pytest.raises(httpx.TimeoutException):
+            await get_with_retries(client, URL, {}, budget=0.2)
+        await asyncio.sleep(0.01)
+
+    assert time.monotonic() - started < 0.3
+    assert cancelled == [0]
+    assert upstream_breaker.failures == 1
+
+
+def test_transport_leaves_connection_retries_to_the_budget():
+    client = create_http_client()
+    assert client._transport._pool._retries == 0
+
+
+async def test_backoff_never_sleeps_past_the_budget(monkeypatch):
+    monkeypatch.setattr(config, "UPSTREAM_RETRIES", 10)
+    monkeypatch.setattr(config, "UPSTREAM_BACKOFF_SECONDS", 0.1)
+    handler, calls, _ = scripted((0, 503))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        started = time.monotonic()
+        with pytest.raises(httpx.HTTPStatusError):
+            await get_with_retries(client, URL, {}, budget=0.25)
+
+    assert time.monotonic() - started < 0.25
+    assert 1 <= len(calls) < 10
+
+
+async def test_open_circuit_fails_fast_without_calling_upstream(monkeypatch):
+    monkeypatch.setattr(config, "UPSTREAM_RETRIES", 0)
+    handler, calls, _ = scripted((0, 500))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        for _ in range(upstream_breaker.failure_threshold):
+            with pytest.raises(httpx.HTTPStatusError):
+                await get_with_retries(client, URL, {})
+        assert upstream_breaker.state == "open"
+
+        with pytest.raises(UpstreamUnavailable) as excinfo:
+            await get_with_retries(client, URL, {})
+
+    assert len(calls) == upstream_breaker.failure_threshold
+    assert excinfo.value.retry_after > 0
+
+
+async def test_no_hedge_before_enough_latency_samples(monkeypatch):
+    monkeypatch.setattr(config, "UPSTREAM_HEDGE", True)
+    handler, calls, _ = scripted((0.05, 200))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        await get_with_retries(client, URL, {})
+
+    assert len(calls) == 1
+
+
+async def test_fast_response_is_not_hedged(hedging):
+    handler, calls, _ = scripted((0, 200))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        response = await get_with_retries(client, URL, {})
+
+    assert response.text == "response 0"
+    assert len(calls) == 1
+
+
+async def test_hedge_wins_over_slow_request_and_cancels_it(hedging):
+    hedged, won = event_count("hedged"), event_count("hedge-won")
+    handler, calls, cancelled = scripted((1.0, 200), (0, 200))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        started = time.monotonic()
+        response = await get_with_retries(client, URL, {})
+        elapsed = time.monotonic() - started
+        await asyncio.sleep(0)
+
+    assert response.text == "response 1"
+    assert elapsed < 0.5
+    assert cancelled == [0]
+    assert event_count("hedged") == hedged + 1
+    assert event_count("hedge-won") == won + 1
+
+
+async def test_first_response_wins_when_it_arrives_before_the_hedge(hedging):
+    won = event_count("hedge-won")
+    handler, calls, cancelled = scripted((0.05, 200), (1.0, 200))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        response = await get_with_retries(client, URL, {})
+        await asyncio.sleep(0)
+
+    assert response.text == "response 0"
+    assert len(calls) == 2
+    assert cancelled == [1]
+    assert event_count("hedge-won") == won
+
+
+async def test_hedge_answers_when_the_first_request_fails(hedging):
+    handler, calls, _ = scripted((0.05, httpx.ConnectError("reset")), (0.1, 200))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        response = await get_with_retries(client, URL, {})
+
+    assert response.text == "response 1"
+    assert len(calls) == 2
+    assert upstream_breaker.failures == 0
+
+
+async def test_attempt_fails_only_when_both_hedged_requests_fail(hedging, monkeypatch):
+    monkeypatch.setattr(config, "UPSTREAM_RETRIES", 0)
+    handler, calls, _ = scripted((0.05, httpx.ConnectError("first")), (0.1, httpx.ConnectError("second")))
+    async with create_http_client(httpx.MockTransport(handler)) as client:
+        with pytest.raises(httpx.ConnectError, match="second"):
+            await get_with_retries(client, URL, {})
+
+    assert len(calls) == 2
+    assert upstream_breaker.failures == 1
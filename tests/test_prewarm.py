@@ -0,0 +1,88 @@
+import httpx
+import pytest
+
+from app import config
+from app.services import store, weather
+from app.services.http_client import create_http_client
+from app.services.prewarm import Prewarmer, forecast_health
+from app.services.regions import REGIONS
+
+pytestmark = pytest.mark.anyio
+
+
+def counting_handler(requests: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        params = request.url.params
+        days = weather.FORECAST_DAYS if params["start_date"] != params["end_date"] else 1
+        latitudes = params["latitude"].split(",")
+        body = [{"hourly": {"precipitation": [0.0] * days * weather.HOURS_PER_DAY}} for _ in latitudes]
+        return httpx.Response(200, json=body)
+    return handler
+
+
+@pytest.fixture
+def shared_store(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "STORE_PATH", str(tmp_path / "forecasts.sqlite3"))
+    yield store.get_store()
+    store.close_store()
+
+
+def restart() -> None:
+    """Forget everything held in process memory, as a new worker would."""
+    weather.forecast_cache.clear()
+    weather.point_cache.clear()
+
+
+async def test_restart_warms_from_the_store_without_going_upstream(shared_store):
+    requests = []
+    async with create_http_client(httpx.MockTransport(counting_handler(requests))) as client:
+        await Prewarmer(client).refresh_all()
+        assert requests
+
+        restart()
+        requests.clear()
+        prewarmer = Prewarmer(client)
+        await prewarmer.refresh_all()
+
+    assert requests == []
+    assert all(weather.peek_forecast(mode) is not None for mode in REGIONS)
+    assert not any(prewarmer.failures.values())
+
+
+async def test_forecast_due_before_the_next_pass_is_refetched(shared_store, monkeypatch):
+    requests = []
+    async with create_http_client(httpx.MockTransport(counting_handler(requests))) as client:
+        await Prewarmer(client).refresh_all()
+        first = {mode: weather.peek_forecast(mode).fetched_at for mode in REGIONS}
+
+        # Every stored run is now older than the refresh age
+        monkeypatch.setattr(config, "PREWARM_INTERVAL_SECONDS", weather.FORECAST_TTL_SECONDS)
+        restart()
+        requests.clear()
+        await Prewarmer(client).refresh_all()
+
+    assert len(requests) >= len(REGIONS)
+    assert all(weather.peek_forecast(mode).fetched_at > first[mode] for mode in REGIONS)
+
+
+async def test_standby_worker_reports_the_leaders_forecast(shared_store):
+    requests = []
+    async with create_http_client(httpx.MockTransport(counting_handler(requests))) as client:
+        leader = Prewarmer(client)
+        leader.leader = True
+        await leader.refresh_all()
+        assert forecast_health(leader).status == "ok"
+
+        restart()
+        health = forecast_health(Prewarmer(client))
+
+    assert health.status == "ok"
+    assert health.prewarm_role == "standby"
+    assert all(mode.fresh and mode.refreshed_at for mode in health.modes)
+
+
+def test_health_is_empty_without_a_forecast_anywhere(shared_store):
+    health = forecast_health(None)
+    assert health.status == "empty"
+    assert health.prewarm_role is None
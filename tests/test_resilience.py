@@ -0,0 +1,85 @@
+import pytest
+
+from app.services.metrics import upstream_events
+from app.services.resilience import LATENCY_MIN_SAMPLES, CircuitBreaker, LatencyWindow, UpstreamUnavailable
+
+
+def test_breaker_stays_closed_below_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_breaker_opens_then_lets_one_trial_through_then_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    opened = upstream_events._values.get(("circuit-opened",), 0)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert upstream_events._values[("circuit-opened",)] == opened + 1
+    with pytest.raises(UpstreamUnavailable) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 30
+
+    clock.advance(10)
+    with pytest.raises(UpstreamUnavailable) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 20
+
+    clock.advance(20)
+    breaker.before_call()
+    assert breaker.state == "half-open"
+    # Only the one trial goes out while it is running
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.retry_after() == 0
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_for_another_interval(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.advance(30)
+    breaker.before_call()
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.retry_after() == 30
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+
+
+def test_abandoned_trial_only_holds_the_circuit_for_one_interval(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.advance(30)
+    breaker.before_call()  # the trial never reports back
+
+    clock.advance(30)
+    breaker.before_call()
+    assert breaker.state == "half-open"
+
+
+def test_latency_window_needs_enough_samples():
+    window = LatencyWindow(size=100)
+    for i in range(LATENCY_MIN_SAMPLES - 1):
+        window.record(i / 1000)
+    assert window.percentile(95) is None
+
+    for i in range(LATENCY_MIN_SAMPLES - 1, 100):
+        window.record(i / 1000)
+    assert window.percentile(50) == pytest.approx(0.050)
+    assert window.percentile(95) == pytest.approx(0.095)
+    assert window.percentile(100) == pytest.approx(0.099)
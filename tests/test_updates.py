@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services import updates
+from app.services.events import forecast_events
+from app.services.http_client import create_http_client
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def open_events():
+    forecast_events.open()
+    yield
+    forecast_events.open()
+
+
+def failing_client() -> httpx.AsyncClient:
+    return create_http_client(httpx.MockTransport(lambda request: httpx.Response(503)))
+
+
+async def test_stream_reports_unavailable_and_stays_open(monkeypatch):
+    monkeypatch.setattr(updates, "HEARTBEAT_SECONDS", 0.05)
+    async with failing_client() as client:
+        stream = updates.forecast_stream(client, "callum")
+        first = await stream.__anext__()
+        second = await stream.__anext__()
+        await stream.aclose()
+
+    event, data = first.split("\n")[:2]
+    assert event == "event: unavailable"
+    assert json.loads(data.removeprefix("data: "))["mode"] == "callum"
+    assert second == ": keepalive\n\n"
+
+
+async def test_stream_ends_when_the_app_shuts_down():
+    async with failing_client() as client:
+        stream = updates.forecast_stream(client, "callum")
+        await stream.__anext__()
+        forecast_events.close()
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(stream.__anext__(), 1)
+
+
+async def test_stream_opened_after_shutdown_ends_at_once():
+    forecast_events.close()
+    async with failing_client() as client:
+        with pytest.raises(StopAsyncIteration):
+            await updates.forecast_stream(client, "callum").__anext__()
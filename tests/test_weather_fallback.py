@@ -0,0 +1,100 @@
+import time
+from datetime import date, timedelta
+
+import httpx
+import numpy as np
+import pytest
+
+from app.services import weather
+from app.services.http_client import create_http_client
+from app.services.resilience import UpstreamUnavailable
+from app.services.weather import (
+    FORECAST_DAYS,
+    GRID_SIZE,
+    ForecastHorizon,
+    _forecast_key,
+    _last_known_forecast,
+    forecast_cache,
+)
+
+TODAY = date.today()
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+def cache_horizon(start_date: date, days: int = FORECAST_DAYS, age: float = 0.0) -> float:
+    """Put a horizon for callum's default grid in the forecast cache; returns its fetch time."""
+    fetched_at = time.time() - age
+    hourly = np.zeros((4, days * weather.HOURS_PER_DAY), dtype=np.float32)
+    forecast_cache.put(_forecast_key("callum", start_date, days, GRID_SIZE), ForecastHorizon(start_date, days, hourly), fetched_at)
+    return fetched_at
+
+
+def failing_client() -> httpx.AsyncClient:
+    return create_http_client(httpx.MockTransport(lambda request: httpx.Response(503)))
+
+
+def test_nothing_cached_means_no_fallback():
+    assert _last_known_forecast("callum", TODAY, FORECAST_DAYS, GRID_SIZE, TODAY) is None
+
+
+def test_expired_entry_is_served_stale():
+    fetched_at = cache_horizon(TODAY, age=5 * 60 * 60)
+
+    entry = _last_known_forecast("callum", TODAY, FORECAST_DAYS, GRID_SIZE, TODAY)
+
+    assert entry.stale
+    assert entry.fetched_at == fetched_at
+    assert entry.value.start_date == TODAY
+    # The cached entry itself is left as it was
+    assert not forecast_cache.peek(_forecast_key("callum", TODAY, FORECAST_DAYS, GRID_SIZE)).stale
+
+
+def test_yesterdays_horizon_covers_today_just_after_midnight():
+    fetched_at = cache_horizon(YESTERDAY)
+
+    entry = _last_known_forecast("callum", TODAY, FORECAST_DAYS, GRID_SIZE, TODAY + timedelta(days=3))
+
+    assert entry.stale
+    assert entry.fetched_at == fetched_at
+    assert entry.value.start_date == YESTERDAY
+    assert entry.value.day(TODAY + timedelta(days=3)).shape == (4, weather.HOURS_PER_DAY)
+
+
+def test_yesterdays_horizon_is_not_used_past_its_last_day():
+    cache_horizon(YESTERDAY)
+    last_day = TODAY + timedelta(days=FORECAST_DAYS - 1)
+
+    assert _last_known_forecast("callum", TODAY, FORECAST_DAYS, GRID_SIZE, last_day) is None
+
+
+def test_yesterday_is_not_used_for_one_day_fetches():
+    cache_horizon(YESTERDAY, days=1)
+    past = TODAY - timedelta(days=30)
+
+    assert _last_known_forecast("callum", past, 1, GRID_SIZE, past) is None
+
+
+def test_other_views_are_not_used():
+    cache_horizon(TODAY)
+
+    assert _last_known_forecast("robert", TODAY, FORECAST_DAYS, GRID_SIZE, TODAY) is None
+    assert _last_known_forecast("callum", TODAY, FORECAST_DAYS, 16, TODAY) is None
+
+
+@pytest.mark.anyio
+async def test_get_forecast_falls_back_to_yesterday_when_upstream_fails():
+    fetched_at = cache_horizon(YESTERDAY)
+
+    async with failing_client() as client:
+        entry = await weather.get_forecast(client, "callum", TODAY + timedelta(days=1))
+
+    assert entry.stale
+    assert entry.fetched_at == fetched_at
+    assert entry.value.start_date == YESTERDAY
+
+
+@pytest.mark.anyio
+async def test_get_forecast_raises_with_nothing_to_fall_back_on():
+    async with failing_client() as client:
+        with pytest.raises(UpstreamUnavailable):
+            await weather.get_forecast(client, "callum")